@@ -6,16 +6,34 @@ Flask extension that extracts swagger spec from flask app & provides
 Swagger UI.
 
 """
+import collections
+import hashlib
+import json
 import os
 import urllib.parse
+from random import random as _random
 
-from flask import Flask, Blueprint, current_app, jsonify, \
-    send_from_directory, url_for, request, redirect
+from flask import Flask, Blueprint, abort, current_app, g, jsonify, \
+    url_for, request, redirect, stream_with_context
 
 from . import core
+from .assets import AssetStore, DEFAULT_MAX_AGE, IMMUTABLE_MAX_AGE, \
+    etag_for
+from .basespec import BaseSpec
+from .cache import SharedFileCache, SpecCache
+from .delta import SpecHistory, spec_hashes
+from .encoding import ENCODERS, Encoded, dumps_json, encode, encode_json, \
+    get_dumps, make_etag, resolve_encoders
 from .extractor import Extractor, MarkExtractor
+from .files import file_watcher
+from .fingerprint import class_digest, fingerprint_app
 from .globals import SWAGGER_UI_DIR
-from .mark import Mark
+from .index import OperationEntry, OperationIndex, SpecIndex
+from .mark import Mark, get_generation
+from .utils import parse_endpoint
+from .rebuild import BackgroundRebuilder
+from .validation import ValidationError, compile_validator, \
+    compile_response_validators
 from .version import VERSION
 
 
@@ -67,10 +85,135 @@ class Swag(object):
 
             Default is ``'/ui'``
 
+        *   SWAG_EXPORT_URL
+
+            URL of operations exported as NDJSON, see :meth:`iter_export`.
+            Default is ``'/operations.ndjson'``. :const:`None` disables it.
+
     And you can use another version of swagger-ui using configuration.
 
         *   SWAG_UI_ROOT
 
+            It can be either a directory or a zip archive. Files are loaded
+            into memory once.
+
+    Swagger-UI assets are served with fingerprinted URLs that can be cached
+    forever, and with gzip/brotli variants cached on first use. To disable
+    fingerprinting, use
+
+        *   SWAG_UI_FINGERPRINT
+
+            Default is :const:`True`
+
+    Requests can be validated against parameters in spec with
+
+        *   SWAG_VALIDATE_REQUESTS
+
+            Default is :const:`False`. Coerced parameters are stored in
+            ``flask.g.swag_parameters``
+
+    Sampled JSON responses can be validated against response schemas with
+
+        *   SWAG_RESPONSE_VALIDATION_RATE
+
+            Rate of sampled responses, e.g. ``0.001``. Default is ``0``.
+            See :meth:`response_mismatch_handler`.
+
+    Spec JSON is encoded by
+
+        *   SWAG_JSON_ENCODER
+
+            Any `dumps` compatible callable, or name of module like
+            ``'orjson'``. Default is compact encoding of stdlib.
+
+        *   SWAG_JSON_MINIFY
+
+            Drop null fields, and empty fields that mean the same as
+            absence. Default is :const:`False`
+
+        *   SWAG_CANONICAL
+
+            Sort paths, methods, parameters and response codes, so that
+            identical apps produce identical bytes & ETags across workers.
+            Default is :const:`False`
+
+    Workers serving the same app can share encoded spec with
+
+        *   SWAG_CACHE_DIR
+
+            Directory of shared spec files. The first worker that
+            generates spec writes it atomically, and others memory map it.
+            Files are keyed by fingerprint of routes, views & marks, and
+            only recently stored ones are kept. Hashes for deltas are stored
+            next to them as ``<key>.hashes``. Default is :const:`None`, not
+            shared.
+
+    Spec can be built on hand-written JSON files, which are watched for
+    modification with
+
+        *   SWAG_BASE_SPEC
+
+            JSON file of hand-written base document, like definitions and
+            security definitions. Generated spec is merged into it. Relative
+            path is resolved from root path of the app. The file is parsed
+            again only when it is modified. Default is :const:`None`
+
+        *   SWAG_FILE_CHECK_INTERVAL
+
+            Seconds between checks of modification of JSON files referenced
+            from marks and ``SWAG_BASE_SPEC`` file. Default is ``1.0``
+
+    Generated spec can be stored on disk, so that fresh processes of
+    unchanged code skip extraction with
+
+        *   SWAG_SNAPSHOT_DIR
+
+            Directory of spec snapshots keyed by fingerprint of routes,
+            view code & marks. `host` and `schemes` are taken from the
+            current request when snapshot is loaded. Default is
+            :const:`None`
+
+    In long-running apps that add routes over time, spec JSON can be
+    regenerated off the request path with
+
+        *   SWAG_BACKGROUND_REBUILD
+
+            Serve last spec while rebuilding it in a background thread.
+            Default is :const:`False`
+
+        *   SWAG_REBUILD_DELAY
+
+            Seconds that routes & marks must stay unchanged before
+            rebuilding. Default is ``0.5``
+
+    Generated spec is cached until routes or marks are changed.
+    Spec JSON URL accepts ``prefix``, ``tag`` and ``operationId`` query
+    parameters to get partial spec. ::
+
+        /swagger/swagger.json?prefix=/users&tag=admin
+
+    Changes since a version can be requested by its ETag, as JSON Patch or
+    as list of changed paths with ``delta=paths``. ::
+
+        /swagger/swagger.json?since=<etag>
+
+    Spec is also served as MessagePack, CBOR or YAML to requests that
+    accept them, if their encoders are installed. See :meth:`spec_encoder`.
+
+    Recent versions are remembered up to
+
+        *   SWAG_HISTORY_SIZE
+
+            Default is ``0``, deltas are disabled, because parts of every
+            version are hashed when it is encoded.
+
+    Operations of a view bound to multiple rules are extracted once. Path
+    items that are same as a previous one are emitted as `$ref` to it with
+
+        *   SWAG_PATH_REFS
+
+            Default is ``False``.
+
 
     """
     def __init__(self, app: Flask=None, extractor: Extractor=None,
@@ -88,6 +231,18 @@ class Swag(object):
         self.app = app
         self.extractor = extractor or MarkExtractor()
         self.mark = mark or Mark()
+        self.response_mismatch_handlers = []
+        #: Map of mimetype to function that makes `dumps` of the format
+        self.encoders = collections.OrderedDict(ENCODERS)
+        self._resolved_encoders = None
+        #: Functions that compile metadata of operations, by name
+        self.metadata_compilers = {
+            'validator': lambda entry: compile_validator(
+                entry.path_item.get('parameters', []) +
+                entry.operation.get('parameters', [])),
+            'response_validators': lambda entry: compile_response_validators(
+                entry.operation.get('responses')),
+        }
         if app is not None:
             self.init_app(app, *args, **kwargs)
 
@@ -99,17 +254,82 @@ class Swag(object):
         app.config.setdefault('SWAG_URL_PREFIX', '/swagger')
         app.config.setdefault('SWAG_JSON_URL', '/swagger.json')
         app.config.setdefault('SWAG_UI_PREFIX', '/ui')
+        app.config.setdefault('SWAG_EXPORT_URL', '/operations.ndjson')
+        app.config.setdefault('SWAG_UI_FINGERPRINT', True)
+        app.config.setdefault('SWAG_VALIDATE_REQUESTS', False)
+        app.config.setdefault('SWAG_RESPONSE_VALIDATION_RATE', 0.0)
+        app.config.setdefault('SWAG_JSON_ENCODER', None)
+        app.config.setdefault('SWAG_JSON_MINIFY', False)
+        app.config.setdefault('SWAG_CANONICAL', False)
+        app.config.setdefault('SWAG_CACHE_DIR', None)
+        app.config.setdefault('SWAG_SNAPSHOT_DIR', None)
+        app.config.setdefault('SWAG_BASE_SPEC', None)
+        app.config.setdefault('SWAG_FILE_CHECK_INTERVAL', 1.0)
+        app.config.setdefault('SWAG_BACKGROUND_REBUILD', False)
+        app.config.setdefault('SWAG_REBUILD_DELAY', 0.5)
+        app.config.setdefault('SWAG_HISTORY_SIZE', 0)
+        app.config.setdefault('SWAG_PATH_REFS', False)
 
         # Add generator too app
-        def generate_swagger():
-            return self.generate_swagger(app, swagger_info, swagger_fields)
+        def generate_swagger(host=None, schemes=None, lazy=False):
+            return self.generate_swagger(app, swagger_info, swagger_fields,
+                                         host=host, schemes=schemes,
+                                         lazy=lazy)
         app.generate_swagger = generate_swagger
 
+        def swagger_fingerprint():
+            return self.fingerprint(app, swagger_info, swagger_fields)
+        app.swagger_fingerprint = swagger_fingerprint
+
+        def load_swagger():
+            return self.load_swagger(app, swagger_fields)
+        app.load_swagger = load_swagger
+        app.swag_cache = SpecCache()
+        #: Map of host URL to :class:`.delta.SpecHistory`
+        app.swag_histories = {}
+        cache_dir = app.config['SWAG_CACHE_DIR']
+        app.swag_shared_cache = None
+        app.swag_shared_hashes = None
+        if cache_dir is not None:
+            app.swag_shared_cache = SharedFileCache(cache_dir)
+            app.swag_shared_hashes = SharedFileCache(cache_dir, 'hashes')
+        base_spec = app.config['SWAG_BASE_SPEC']
+        app.swag_base_spec = None
+        if base_spec is not None:
+            app.swag_base_spec = BaseSpec(os.path.join(app.root_path,
+                                                       base_spec))
+        snapshot_dir = app.config['SWAG_SNAPSHOT_DIR']
+        app.swag_snapshots = None
+        if snapshot_dir is not None:
+            app.swag_snapshots = SharedFileCache(snapshot_dir)
+        app.swag_rebuilder = None
+        if app.config['SWAG_BACKGROUND_REBUILD']:
+            app.swag_rebuilder = BackgroundRebuilder(
+                lambda host_url: self.rebuild_encoded_swagger(app, host_url),
+                lambda: self.get_spec_version(app),
+                delay=app.config['SWAG_REBUILD_DELAY'],
+                logger=app.logger,
+            )
+
         self.register_blueprint(app)
+        # `flask` command is available since Flask 0.11
+        if hasattr(app, 'cli'):
+            self.register_commands(app)
+        if app.config['SWAG_VALIDATE_REQUESTS']:
+            app.before_request(self.validate_request)
+        rate = app.config['SWAG_RESPONSE_VALIDATION_RATE']
+        if rate > 0:
+            # Keep it cheap for responses not sampled
+            def sample_response(response):
+                if _random() >= rate:
+                    return response
+                return self.validate_response(response)
+            app.after_request(sample_response)
 
     def generate_swagger(self, app: Flask=current_app, swagger_info=None,
                          swagger_fields=None, swag_blueprint='swag',
-                         extractor_kwargs=None):
+                         extractor_kwargs=None, host=None, schemes=None,
+                         lazy=False):
         """
         Generate swagger spec from `app`.
 
@@ -124,6 +344,15 @@ class Swag(object):
         :extractor_kwargs: kwargs to be passed to extractor's
                            :meth:`extract_paths`
 
+        :param host: host of API, default is host of current request.
+
+        :param schemes: schemes of API, default is scheme of current
+                        request.
+
+        :param lazy: operations are :class:`.core.LazyMapping` that are
+                     extracted on first access. Use encoders in
+                     :mod:`.encoding` to serialize it.
+
         """
         # Normalize args
         swagger_fields = swagger_fields or {}
@@ -132,16 +361,24 @@ class Swag(object):
             version=app.config['SWAG_API_VERSION'],
         )
         # Extract info from current request
-        parsed = urllib.parse.urlparse(request.host_url)
-        schemes = [parsed.scheme]
-        host = parsed.netloc
+        if host is None or schemes is None:
+            parsed = urllib.parse.urlparse(request.host_url)
+            if schemes is None:
+                schemes = [parsed.scheme]
+            if host is None:
+                host = parsed.netloc
 
         # Extract paths from app
         ex_kwargs = {
             'exclude_blueprint': swag_blueprint,
+            'path_refs': app.config['SWAG_PATH_REFS'],
         }
         ex_kwargs.update(extractor_kwargs or {})
-        paths = self.extractor.extract_paths(app, **ex_kwargs)
+        if lazy and 'paths' not in swagger_fields:
+            paths = {}
+        else:
+            lazy = False
+            paths = self.extractor.extract_paths(app, **ex_kwargs)
 
         # Build kwargs for core.Swagger
         kwargs = {
@@ -154,7 +391,556 @@ class Swag(object):
 
         # Update with swagger_fields
         kwargs.update(swagger_fields)
-        return core.dump(core.Swagger(**kwargs))
+        swagger = core.dump(core.Swagger(**kwargs))
+        for item in swagger['paths'].values():
+            for operation in item.values():
+                if isinstance(operation, dict):
+                    core.share_parameters(operation)
+        if lazy:
+            swagger['paths'] = {
+                extracted.path: extracted.item
+                for extracted in self.extractor.iter_paths(
+                    app, lazy=True, **ex_kwargs)
+            }
+        if app.swag_base_spec is not None:
+            swagger = app.swag_base_spec.merge(swagger)
+        return swagger
+
+    def get_spec_version(self, app: Flask=current_app):
+        """
+        Get cheap token that changes whenever spec of `app` may change.
+
+        Flask does not remove rules from URL map, so the number of rules and
+        the generation of marks are enough to detect changes, with
+        modification of files referenced by :class:`.files.JSONFile` and
+        ``SWAG_BASE_SPEC`` file.
+
+        """
+        interval = app.config['SWAG_FILE_CHECK_INTERVAL']
+        version = (len(app.url_map._rules), get_generation(),
+                   file_watcher.version(interval))
+        if app.swag_base_spec is not None:
+            version += (app.swag_base_spec.version(interval),)
+        return version
+
+    def fingerprint(self, app: Flask=current_app, swagger_info=None,
+                    swagger_fields=None) -> str:
+        """
+        Fingerprint inputs of spec of `app`, that is stable across
+        processes. See :func:`.fingerprint.fingerprint_app`.
+
+        """
+        config = app.config
+        extras = [
+            config.get('SWAG_TITLE'), config.get('SWAG_API_VERSION'),
+            config['SWAG_BLUEPRINT_NAME'], config['SWAG_JSON_ENCODER'],
+            config['SWAG_JSON_MINIFY'], config['SWAG_CANONICAL'],
+            config['SWAG_BASE_SPEC'], config['SWAG_PATH_REFS'],
+            app.swag_base_spec and app.swag_base_spec.version(),
+        ]
+        return fingerprint_app(app, VERSION, swagger_info, swagger_fields,
+                               class_digest(type(self.extractor)), extras)
+
+    def get_fingerprint(self, app: Flask=current_app) -> str:
+        """Get fingerprint of spec inputs, once per spec version."""
+        version = self.get_spec_version(app)
+        return app.swag_cache.get(version, 'fingerprint',
+                                  app.swagger_fingerprint)
+
+    def load_swagger(self, app: Flask=current_app, swagger_fields=None):
+        """
+        Load swagger spec from snapshot in ``SWAG_SNAPSHOT_DIR`` that
+        matches fingerprint of `app`, or generate and store it.
+        Without the directory, it just generates spec.
+
+        """
+        if app.swag_snapshots is None:
+            return app.generate_swagger(lazy=True)
+
+        def generate():
+            return dumps_json(app.generate_swagger())
+        data = app.swag_snapshots.get(self.get_fingerprint(app), generate)
+        try:
+            swagger = json.loads(data[:].decode('utf-8'))
+        finally:
+            data.close()
+        # Snapshot is shared by hosts
+        swagger_fields = swagger_fields or {}
+        parsed = urllib.parse.urlparse(request.host_url)
+        if 'host' not in swagger_fields:
+            swagger['host'] = parsed.netloc
+        if 'schemes' not in swagger_fields:
+            swagger['schemes'] = [parsed.scheme]
+        return swagger
+
+    def get_swagger(self, app: Flask=current_app):
+        """Get swagger spec for current request, from cache if possible."""
+        version = self.get_spec_version(app)
+        return app.swag_cache.get(version, ('swagger', request.host_url),
+                                  app.load_swagger)
+
+    def get_index(self, app: Flask=current_app) -> SpecIndex:
+        """Get index over paths of swagger spec."""
+        version = self.get_spec_version(app)
+
+        def make_index():
+            return SpecIndex(self.get_swagger(app).get('paths', {}))
+        return app.swag_cache.get(version, 'index', make_index)
+
+    def query_swagger(self, app: Flask=current_app, prefix=None, tags=(),
+                      operation_ids=()):
+        """
+        Get partial swagger spec that only contains operations matched with
+        filters. See :meth:`.index.SpecIndex.query`.
+
+        """
+        swagger = self.get_swagger(app)
+        if prefix is None and not tags and not operation_ids:
+            return swagger
+        paths = self.get_index(app).query(prefix, tags, operation_ids)
+        return dict(swagger, paths=paths)
+
+    def spec_encoder(self, mimetype: str):
+        """
+        Register encoder of spec for `mimetype`. ::
+
+            @swag.spec_encoder('application/toml')
+            def dumps(swagger):
+                return toml.dumps(swagger)
+
+        """
+        def decorator(fn):
+            self.encoders[mimetype] = lambda: fn
+            self._resolved_encoders = None
+            return fn
+        return decorator
+
+    def get_encoders(self) -> dict:
+        """Get `dumps` of formats whose encoders are installed."""
+        resolved = self._resolved_encoders
+        if resolved is None:
+            resolved = self._resolved_encoders = resolve_encoders(
+                self.encoders)
+        return resolved
+
+    def negotiate_mimetype(self) -> str:
+        """
+        Select format of spec by ``Accept`` header of current request.
+        JSON is preferred on ties, and used if nothing is acceptable.
+
+        """
+        mimetypes = ['application/json']
+        mimetypes.extend(self.get_encoders())
+        return request.accept_mimetypes.best_match(mimetypes) or \
+            'application/json'
+
+    def encode_swagger(self, swagger: dict, app: Flask=current_app,
+                       mimetype='application/json') -> Encoded:
+        """
+        Encode swagger spec with ``SWAG_JSON_ENCODER``, ``SWAG_JSON_MINIFY``
+        and ``SWAG_CANONICAL``. See :func:`.encoding.encode_json`.
+        Other formats are encoded with registered encoders.
+
+        """
+        minified = app.config['SWAG_JSON_MINIFY']
+        canonical = app.config['SWAG_CANONICAL']
+        if mimetype != 'application/json':
+            return encode(swagger, self.get_encoders()[mimetype], mimetype,
+                          minified=minified, canonical=canonical)
+        dumps = get_dumps(app.config['SWAG_JSON_ENCODER'])
+        return encode_json(swagger, dumps, minified=minified,
+                           canonical=canonical)
+
+    def get_encoded_swagger(self, app: Flask=current_app, prefix=None,
+                            tags=(), operation_ids=(),
+                            mimetype='application/json') -> Encoded:
+        """
+        Get encoded swagger spec for current request. Full spec is encoded
+        once per spec version & format, partial spec is encoded for each
+        call. With ``SWAG_BACKGROUND_REBUILD``, last full JSON spec is
+        returned while new one is built.
+
+        """
+        if prefix is not None or tags or operation_ids:
+            return self.encode_swagger(self.query_swagger(
+                app, prefix, tags, operation_ids), app, mimetype)
+        if mimetype != 'application/json':
+            version = self.get_spec_version(app)
+            return app.swag_cache.get(
+                version, (mimetype, request.host_url),
+                lambda: self.encode_swagger(self.get_swagger(app), app,
+                                            mimetype))
+        if app.swag_rebuilder is not None:
+            return app.swag_rebuilder.get(
+                request.host_url, self.get_spec_version(app),
+                lambda: self.build_encoded_swagger(app))
+        return self.build_encoded_swagger(app)
+
+    def rebuild_encoded_swagger(self, app: Flask, host_url: str) -> Encoded:
+        """Build encoded full spec for `host_url` outside of request."""
+        with app.test_request_context(base_url=host_url):
+            return self.build_encoded_swagger(app)
+
+    def build_encoded_swagger(self, app: Flask=current_app) -> Encoded:
+        """Get encoded full spec for current request, once per version."""
+        version = self.get_spec_version(app)
+        if app.swag_shared_cache is not None:
+            return app.swag_cache.get(version, ('json', request.host_url),
+                                      lambda: self.load_shared_swagger(app))
+
+        def build():
+            swagger = self.get_swagger(app)
+            return self.encode_swagger(swagger, app)._replace(
+                hashes=self.hash_swagger(swagger, app))
+        return app.swag_cache.get(version, ('json', request.host_url), build)
+
+    def load_shared_swagger(self, app: Flask=current_app) -> Encoded:
+        """
+        Load encoded spec for current request from ``SWAG_CACHE_DIR``, or
+        generate and store it if no worker has done yet. Data of the
+        result is memory mapped file. Hashes for deltas are stored next to
+        it, so that other workers do not decode it.
+
+        """
+        key = hashlib.sha256('{}\0{}'.format(
+            self.get_fingerprint(app), request.host_url,
+        ).encode('utf-8')).hexdigest()
+        mimetype = 'application/json'
+
+        def generate():
+            swagger = self.get_swagger(app)
+            hashes = self.hash_swagger(swagger, app)
+            if hashes is not None:
+                # Stored first, so that it exists whenever spec does
+                app.swag_shared_hashes.store(
+                    key, json.dumps(hashes).encode('utf-8'))
+            return self.encode_swagger(swagger, app).data
+        data = app.swag_shared_cache.get(key, generate)
+        encoded = Encoded(data=data, mimetype=mimetype, etag=make_etag(data))
+        if not app.config['SWAG_HISTORY_SIZE']:
+            return encoded
+        mapped = app.swag_shared_hashes.load(key)
+        if mapped is not None:
+            with mapped:
+                return encoded._replace(
+                    hashes=json.loads(mapped[:].decode('utf-8')))
+        # Stored while deltas were disabled, the spec itself is not kept
+        return encoded._replace(hashes=self.hash_swagger(
+            lambda: self.decode_encoded(encoded), app))
+
+    def prebuild(self, app: Flask, host: str, schemes=('http',)) -> Encoded:
+        """
+        Build encoded spec outside of request, e.g. in master process of
+        gunicorn with ``--preload`` so that workers share it copy-on-write.
+        Only the encoded bytes and hashes of its parts for deltas are kept
+        in cache, not the spec dict. ::
+
+            swag.prebuild(app, host='api.example.com', schemes=['https'])
+
+        It is served to requests whose host URL is
+        ``<schemes[0]>://<host>/``, until routes or marks are changed.
+
+        """
+        schemes = list(schemes)
+        with app.app_context():
+            version = self.get_spec_version(app)
+            swagger = app.generate_swagger(host=host, schemes=schemes)
+            encoded = self.encode_swagger(swagger, app)._replace(
+                hashes=self.hash_swagger(swagger, app))
+            del swagger
+        host_url = '{}://{}/'.format(schemes[0], host)
+        return app.swag_cache.get(version, ('json', host_url),
+                                  lambda: encoded)
+
+    def get_history(self, app: Flask=current_app) -> SpecHistory:
+        """Get history of spec versions for current request's host."""
+        history = app.swag_histories.get(request.host_url)
+        if history is None:
+            size = app.config['SWAG_HISTORY_SIZE']
+            history = app.swag_histories.setdefault(request.host_url,
+                                                    SpecHistory(size))
+        return history
+
+    def hash_swagger(self, swagger, app: Flask=current_app) -> dict:
+        """
+        Hash parts of full spec for deltas, see :func:`.delta.spec_hashes`.
+
+        :param swagger: spec, or function that returns it.
+        :returns: hashes, or :const:`None` if deltas are disabled.
+
+        """
+        if not app.config['SWAG_HISTORY_SIZE']:
+            return None
+        if callable(swagger):
+            swagger = swagger()
+        return spec_hashes(swagger)
+
+    def decode_encoded(self, encoded: Encoded) -> dict:
+        """
+        Decode encoded JSON spec. The result is not cached, so that workers
+        keep only encoded bytes.
+
+        """
+        return json.loads(bytes(encoded.data).decode('utf-8'))
+
+    def record_version(self, encoded: Encoded, app: Flask=current_app):
+        """
+        Remember version of encoded full spec for later deltas, with hashes
+        computed when it is encoded.
+
+        """
+        if not app.config['SWAG_HISTORY_SIZE']:
+            return
+        self.get_history(app).record(
+            encoded.etag, lambda: encoded.hashes or spec_hashes(
+                self.decode_encoded(encoded)))
+
+    def send_delta(self, since: str, format='patch', app: Flask=current_app):
+        """
+        Send changes of full spec since version `since`, either as JSON
+        Patch or as changed & removed paths when `format` is ``'paths'``.
+
+        :returns: response, or :const:`None` if `since` is unknown.
+
+        """
+        encoded = self.get_encoded_swagger(app)
+        self.record_version(encoded, app)
+        history = self.get_history(app)
+        since = since.strip('"')
+        if format == 'paths':
+            delta = history.make_changes(since, encoded.etag)
+            mimetype = 'application/json'
+        else:
+            # Encoded spec may be stale or loaded from other workers, so
+            # values are taken from it rather than from `get_swagger`
+            delta = history.make_patch(since, encoded.etag,
+                                       lambda: self.decode_encoded(encoded))
+            mimetype = 'application/json-patch+json'
+        if delta is None:
+            return None
+        data = get_dumps(app.config['SWAG_JSON_ENCODER'])(delta)
+        response = current_app.response_class(data, mimetype=mimetype)
+        # Let clients know the version they get by applying the delta
+        response.set_etag(encoded.etag)
+        return response
+
+    def send_encoded(self, encoded: Encoded, chunk_size=65536):
+        """
+        Send encoded spec with ETag. Memory mapped data is streamed in
+        chunks, not copied as a whole.
+
+        """
+        data = encoded.data
+        if isinstance(data, bytes):
+            response = current_app.response_class(data,
+                                                  mimetype=encoded.mimetype)
+        else:
+            def generate():
+                for offset in range(0, len(data), chunk_size):
+                    yield data[offset:offset + chunk_size]
+            response = current_app.response_class(
+                generate(), mimetype=encoded.mimetype,
+                direct_passthrough=True)
+            response.content_length = len(data)
+        response.set_etag(encoded.etag)
+        return response.make_conditional(request.environ)
+
+    def iter_operations(self, app: Flask=current_app):
+        """
+        Iterate `(endpoint, method, path, path_item, operation)` in dumped
+        spec.
+
+        """
+        paths = self.get_swagger(app).get('paths', {})
+        endpoints = self.extractor.collect_endpoints(
+            app, exclude_blueprint=app.config['SWAG_BLUEPRINT_NAME'])
+        for rule, methods in endpoints.items():
+            path, _ = self.extractor.parse_werkzeug_rule(rule, {})
+            item = paths.get(path, {})
+            for method, endpoint in methods.items():
+                operation = item.get(method.lower())
+                if operation is not None:
+                    yield endpoint, method, path, item, operation
+
+    def get_operation_index(self, app: Flask=current_app) -> OperationIndex:
+        """
+        Get index of operations by `(endpoint, method)`. It is rebuilt when
+        routes or marks are changed. If an endpoint has multiple rules,
+        the first rule is used.
+
+        """
+        version = self.get_spec_version(app)
+
+        def make_index():
+            return OperationIndex(self.iter_operations(app),
+                                  self.metadata_compilers)
+        return app.swag_cache.get(version, 'operations', make_index)
+
+    def lookup(self, endpoint: str=None, method: str=None,
+               app: Flask=current_app) -> OperationEntry:
+        """
+        Get operation of endpoint & method, default is of current request.
+        Compiled metadata is available in `metadata` of the entry. ::
+
+            entry = swag.lookup()
+            if entry and entry.operation.get('deprecated'):
+                ...
+
+        :returns: :class:`.index.OperationEntry` or :const:`None`
+
+        """
+        if endpoint is None:
+            endpoint = request.endpoint
+        if method is None:
+            method = request.method
+        return self.get_operation_index(app).get(endpoint, method)
+
+    def operation_metadata(self, name: str):
+        """
+        Register function that compiles metadata of operations. It is
+        called with :class:`.index.OperationEntry` at first access. ::
+
+            @swag.operation_metadata('scopes')
+            def compile_scopes(entry):
+                return frozenset(entry.operation.get('tags', ()))
+
+            swag.lookup().metadata['scopes']
+
+        """
+        def decorator(fn):
+            self.metadata_compilers[name] = fn
+            return fn
+        return decorator
+
+    def validate_request(self):
+        """
+        Validate current request with compiled validator of its endpoint.
+        This is registered as `before_request` hook when
+        ``SWAG_VALIDATE_REQUESTS`` is enabled.
+
+        """
+        entry = self.lookup(app=current_app)
+        if entry is None:
+            return None
+        validator = entry.metadata['validator']
+        try:
+            g.swag_parameters = validator(request._get_current_object())
+        except ValidationError as e:
+            return self.handle_validation_error(e)
+        return None
+
+    def handle_validation_error(self, error: ValidationError):
+        """Make response for invalid request."""
+        response = jsonify(errors=error.errors)
+        response.status_code = 400
+        return response
+
+    def validate_response(self, response):
+        """
+        Validate JSON response against schema of its status code.
+        Sampled responses are validated as `after_request` hook when
+        ``SWAG_RESPONSE_VALIDATION_RATE`` is positive.
+
+        Mismatches are reported to :meth:`report_response_mismatch`,
+        including malformed JSON. Response itself is never changed.
+
+        """
+        if response.is_streamed or not response.is_json:
+            return response
+        entry = self.lookup(app=current_app)
+        if entry is None:
+            return response
+        validators = entry.metadata['response_validators']
+        if not validators:
+            return response
+        validator = validators.get(str(response.status_code)) or \
+            validators.get('default')
+        if validator is None:
+            return response
+        data = response.get_json(silent=True)
+        if data is None and response.get_data().strip() != b'null':
+            self.report_response_mismatch(response, {'': "Malformed JSON"})
+            return response
+        try:
+            validator(data)
+        except ValidationError as e:
+            self.report_response_mismatch(response, e.errors)
+        return response
+
+    def response_mismatch_handler(self, fn):
+        """
+        Register function that receives mismatched responses. ::
+
+            @swag.response_mismatch_handler
+            def report(endpoint, method, response, errors):
+                statsd.incr('swagger.mismatch.' + endpoint)
+
+        """
+        self.response_mismatch_handlers.append(fn)
+        return fn
+
+    def report_response_mismatch(self, response, errors: dict):
+        """
+        Report response that does not match with its schema to registered
+        handlers. If no handler is registered, it is logged as warning.
+
+        """
+        endpoint, method = request.endpoint, request.method
+        if not self.response_mismatch_handlers:
+            current_app.logger.warning(
+                "Response of %s %s (%s) does not match with schema: %r",
+                method, endpoint, response.status_code, errors)
+        for handler in self.response_mismatch_handlers:
+            handler(endpoint, method, response, errors)
+
+    def iter_export(self, app: Flask=current_app, extractor_kwargs=None):
+        """
+        Export operations one by one, without building whole spec. Each
+        item is a dict of `path`, `method`, `endpoint`, `blueprint` and
+        dumped `operation`.
+
+        :extractor_kwargs: kwargs to be passed to extractor's
+                           :meth:`iter_paths`
+
+        """
+        ex_kwargs = {
+            'exclude_blueprint': app.config['SWAG_BLUEPRINT_NAME'],
+        }
+        ex_kwargs.update(extractor_kwargs or {})
+        schema = core.get_schema('OperationSchema')
+        for extracted in self.extractor.iter_paths(app, **ex_kwargs):
+            for method, endpoint in extracted.endpoints.items():
+                operation = extracted.item.get(method.lower())
+                if operation is None:
+                    continue
+                blueprint, _ = parse_endpoint(endpoint)
+                yield {
+                    'path': extracted.path,
+                    'method': method.lower(),
+                    'endpoint': endpoint,
+                    'blueprint': blueprint,
+                    'operation': core.dump(operation, schema),
+                }
+
+    def iter_ndjson(self, app: Flask=current_app, extractor_kwargs=None):
+        """Encode :meth:`iter_export` as lines of newline delimited JSON."""
+        dumps = get_dumps(app.config['SWAG_JSON_ENCODER'])
+        for item in self.iter_export(app, extractor_kwargs):
+            yield dumps_json(item, dumps) + b'\n'
+
+    def register_commands(self, app: Flask):
+        """
+        Register ``flask swag-export`` command that writes operations as
+        NDJSON to stdout.
+
+        """
+        import click
+
+        @app.cli.command('swag-export')
+        def swag_export():
+            """Export operations as newline delimited JSON."""
+            for line in self.iter_ndjson(app):
+                click.echo(line, nl=False)
 
     def inject_swagger_url(self, html, url):
         """
@@ -185,37 +971,101 @@ class Swag(object):
             html = first + tag + '</body>' + rest
         return html
 
+    def send_asset(self, store: AssetStore, asset, max_age=DEFAULT_MAX_AGE,
+                   immutable=False):
+        """Send asset from memory, in best encoding for the request."""
+        encoding = store.select_encoding(asset, request.accept_encodings)
+        if encoding is None:
+            body = asset.data
+        else:
+            body = asset.variants[encoding]
+        response = current_app.response_class(body, mimetype=asset.mimetype)
+        if encoding is not None:
+            response.content_encoding = encoding
+        response.set_etag(etag_for(asset, encoding))
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        if immutable:
+            response.headers['Cache-Control'] += ', immutable'
+        return response.make_conditional(request.environ)
+
     def make_blueprint(self, blueprint_name, swagger_ui_root, json_url,
-                       ui_prefix) -> Blueprint:
+                       ui_prefix, fingerprint=True, export_url=None) \
+            -> Blueprint:
         """
         Create a new Swagger UI related blueprint.
 
         :param blueprint_name: name of the blueprint. default is `'swag'`
-        :param swagger_ui_root: root path for swagger-ui.
+        :param swagger_ui_root: root path for swagger-ui. It can be either
+                                a directory or a zip archive.
         :param json_url: swagger spec json URL.
         :param ui_prefix: prefix URL for swagger-ui
+        :param fingerprint: serve swagger-ui with fingerprinted URLs.
+        :param export_url: URL of operations exported as NDJSON.
 
         """
         blueprint = Blueprint(blueprint_name, __name__)
+        store = AssetStore(swagger_ui_root)
+        index_html = store.assets['index.html'].data.decode('utf-8')
+        if fingerprint:
+            index_html = store.rewrite_html(index_html)
+        #: Map of swagger JSON URL to rendered index
+        rendered_indexes = {}
 
         @blueprint.route(json_url)
         def swagger_json():
-            swagger = current_app.generate_swagger()
-            return jsonify(swagger)
+            prefix = request.args.get('prefix')
+            tags = request.args.getlist('tag')
+            operation_ids = request.args.getlist('operationId')
+            mimetype = self.negotiate_mimetype()
+            if mimetype == 'application/json' and prefix is None and \
+                    not tags and not operation_ids:
+                since = request.args.get('since')
+                if since is not None:
+                    response = self.send_delta(
+                        since, request.args.get('delta', 'patch'),
+                        current_app)
+                    if response is not None:
+                        response.vary.add('Accept')
+                        return response
+                encoded = self.get_encoded_swagger(current_app)
+                self.record_version(encoded, current_app)
+            else:
+                encoded = self.get_encoded_swagger(
+                    current_app, prefix, tags, operation_ids, mimetype)
+            response = self.send_encoded(encoded)
+            response.vary.add('Accept')
+            return response
+
+        if export_url is not None:
+            @blueprint.route(export_url)
+            def swagger_export():
+                app = current_app._get_current_object()
+                return current_app.response_class(
+                    stream_with_context(self.iter_ndjson(app)),
+                    mimetype='application/x-ndjson')
 
         @blueprint.route('{}/<path:path>'.format(ui_prefix))
         def swagger_ui(path):
-            return send_from_directory(swagger_ui_root, path,
-                                       cache_timeout=3600)
+            asset, fingerprinted = store.lookup(path)
+            if asset is None:
+                abort(404)
+            if fingerprinted:
+                return self.send_asset(store, asset, IMMUTABLE_MAX_AGE,
+                                       immutable=True)
+            return self.send_asset(store, asset)
 
         @blueprint.route('{}/'.format(ui_prefix))
         def swagger_ui_index():
-            with open(os.path.join(swagger_ui_root, 'index.html')) as f:
-                html = f.read()
-            # Inject javascript code
             url = url_for('{}.swagger_json'.format(blueprint_name))
-            html = self.inject_swagger_url(html, url)
-            return html, 200
+            asset = rendered_indexes.get(url)
+            if asset is None:
+                # Inject javascript code
+                html = self.inject_swagger_url(index_html, url)
+                asset = rendered_indexes[url] = store.make_asset(
+                    'index.html', html.encode('utf-8'))
+            return self.send_asset(store, asset, max_age=0)
 
         @blueprint.route(ui_prefix)
         def swagger_ui_prefix():
@@ -238,9 +1088,12 @@ class Swag(object):
         swagger_ui_root = app.config['SWAG_UI_ROOT']
         json_url = app.config['SWAG_JSON_URL']
         ui_prefix = app.config['SWAG_UI_PREFIX']
+        fingerprint = app.config['SWAG_UI_FINGERPRINT']
+        export_url = app.config['SWAG_EXPORT_URL']
 
         blueprint = self.make_blueprint(blueprint_name, swagger_ui_root,
-                                        json_url, ui_prefix)
+                                        json_url, ui_prefix, fingerprint,
+                                        export_url)
         app.register_blueprint(blueprint, url_prefix=prefix)
 
         return blueprint
@@ -0,0 +1,253 @@
+"""
+assets
+======
+
+In-memory store of Swagger-UI static files.
+
+The store loads every file once when the blueprint is created, from a
+directory or a single zip archive. It hashes every file to make content
+addressed (*fingerprinted*) URLs which can be cached forever. Compressed
+variants of text files are built on first request of each encoding, so
+files never requested cost nothing. Files are served from memory with
+precomputed ETags.
+
+"""
+import collections
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import zipfile
+
+#: Length of hex digest in fingerprinted file names
+DIGEST_LENGTH = 12
+
+#: Max age for fingerprinted assets (1 year)
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+#: Max age for assets with plain paths
+DEFAULT_MAX_AGE = 3600
+
+#: Mimetypes that worth to be compressed
+COMPRESSIBLE_MIMETYPES = (
+    'text/',
+    'application/javascript',
+    'application/json',
+    'image/svg+xml',
+)
+
+#: Files smaller than this are not worth to be compressed
+COMPRESS_MIN_SIZE = 256
+
+#: Encodings in preferred order
+ENCODINGS = ('br', 'gzip')
+
+Asset = collections.namedtuple(
+    'Asset', ['path', 'fingerprinted', 'digest', 'mimetype', 'data',
+              'variants'])
+
+_REFERENCE_PATTERN = re.compile(
+    r'''(?P<attr>\b(?:src|href)=)(?P<quote>['"])(?P<path>[^'"]+)(?P=quote)''')
+
+
+def _brotli_compress(data):
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli.compress(data)
+
+
+def compress_variant(data: bytes, encoding: str) -> bytes:
+    """
+    Compress `data` with `encoding`.
+
+    :returns: compressed data, or :const:`None` if it is not smaller than
+              original or brotli is not installed.
+
+    """
+    if encoding == 'br':
+        compressed = _brotli_compress(data)
+    elif encoding == 'gzip':
+        compressed = gzip.compress(data, compresslevel=9)
+    else:
+        compressed = None
+    if compressed is None or len(compressed) >= len(data):
+        return None
+    return compressed
+
+
+class Variants(object):
+    """
+    Compressed variants of asset data, each of them is built on its first
+    use and kept.
+
+    :param data: original data.
+    :param compressible: whether the data is worth to be compressed.
+
+    """
+    def __init__(self, data: bytes, compressible=True):
+        self.data = data
+        self.compressible = compressible and len(data) >= COMPRESS_MIN_SIZE
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    def get(self, encoding: str) -> bytes:
+        """Get variant of `encoding`, or :const:`None` if not available."""
+        if not self.compressible:
+            return None
+        try:
+            return self._variants[encoding]
+        except KeyError:
+            pass
+        with self._lock:
+            if encoding not in self._variants:
+                self._variants[encoding] = compress_variant(self.data,
+                                                            encoding)
+            return self._variants[encoding]
+
+    def __contains__(self, encoding):
+        return self.get(encoding) is not None
+
+    def __getitem__(self, encoding):
+        variant = self.get(encoding)
+        if variant is None:
+            raise KeyError(encoding)
+        return variant
+
+
+def fingerprint_name(path: str, digest: str) -> str:
+    """Insert digest before extension, ``a/b.js`` -> ``a/b.<digest>.js``"""
+    base, ext = os.path.splitext(path)
+    return '{}.{}{}'.format(base, digest, ext)
+
+
+def minified_name(path: str) -> str:
+    """``a/b.js`` -> ``a/b.min.js``"""
+    base, ext = os.path.splitext(path)
+    if base.endswith('.min'):
+        return path
+    return '{}.min{}'.format(base, ext)
+
+
+def iter_directory(root: str):
+    """Iterate `(path, data)` of files in directory."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            full_path = os.path.join(dirpath, filename)
+            path = os.path.relpath(full_path, root).replace(os.sep, '/')
+            with open(full_path, 'rb') as f:
+                yield path, f.read()
+
+
+def iter_archive(filename: str):
+    """
+    Iterate `(path, data)` of files in zip archive. If all files are in a
+    single top level directory, the directory is stripped from paths.
+
+    """
+    with zipfile.ZipFile(filename) as archive:
+        names = sorted(name for name in archive.namelist()
+                       if not name.endswith('/'))
+        prefix = os.path.commonprefix(names)
+        prefix = prefix[:prefix.rfind('/') + 1]
+        for name in names:
+            yield name[len(prefix):], archive.read(name)
+
+
+def etag_for(asset: Asset, encoding: str=None) -> str:
+    """ETag of a variant of asset."""
+    if encoding is None:
+        return asset.digest
+    return '{}-{}'.format(asset.digest, encoding)
+
+
+class AssetStore(object):
+    """
+    In-memory store of assets with fingerprinting & lazy compression.
+
+    :param source: root directory of assets or path of zip archive.
+    :param minified: prefer ``*.min.*`` files when rewriting references.
+
+    """
+    def __init__(self, source: str, minified=True):
+        self.source = source
+        self.minified = minified
+        #: Map of relative path to asset
+        self.assets = {}
+        #: Map of fingerprinted path to asset
+        self.fingerprinted = {}
+        if os.path.isdir(source):
+            files = iter_directory(source)
+        else:
+            files = iter_archive(source)
+        for path, data in files:
+            asset = self.make_asset(path, data)
+            self.assets[path] = asset
+            self.fingerprinted[asset.fingerprinted] = asset
+
+    def make_asset(self, path: str, data: bytes) -> Asset:
+        """Make an asset from its content."""
+        digest = hashlib.sha256(data).hexdigest()[:DIGEST_LENGTH]
+        mimetype, _ = mimetypes.guess_type(path)
+        mimetype = mimetype or 'application/octet-stream'
+        return Asset(
+            path=path,
+            fingerprinted=fingerprint_name(path, digest),
+            digest=digest,
+            mimetype=mimetype,
+            data=data,
+            variants=Variants(
+                data, mimetype.startswith(COMPRESSIBLE_MIMETYPES)),
+        )
+
+    def lookup(self, path: str) -> (Asset, bool):
+        """
+        Find asset by plain or fingerprinted path.
+
+        :returns: tuple of asset (or :const:`None`) and whether `path` is
+                  fingerprinted.
+
+        """
+        asset = self.fingerprinted.get(path)
+        if asset is not None:
+            return asset, True
+        return self.assets.get(path), False
+
+    def resolve(self, path: str) -> Asset:
+        """Get asset for `path`, preferring minified one."""
+        if self.minified:
+            asset = self.assets.get(minified_name(path))
+            if asset is not None:
+                return asset
+        return self.assets.get(path)
+
+    def rewrite_html(self, html: str) -> str:
+        """Rewrite relative ``src`` & ``href`` to fingerprinted paths."""
+        def replace(match):
+            asset = self.resolve(match.group('path'))
+            if asset is None:
+                return match.group()
+            return '{attr}{quote}{path}{quote}'.format(
+                attr=match.group('attr'),
+                quote=match.group('quote'),
+                path=asset.fingerprinted,
+            )
+        return _REFERENCE_PATTERN.sub(replace, html)
+
+    def select_encoding(self, asset: Asset, accept_encodings) -> str:
+        """
+        Select best variant for `Accept-Encoding`. Only variants of
+        accepted encodings are built.
+
+        :param accept_encodings: :class:`werkzeug.datastructures.Accept`
+        :returns: encoding name or :const:`None` for identity.
+
+        """
+        for encoding in ENCODINGS:
+            if accept_encodings[encoding] and encoding in asset.variants:
+                return encoding
+        return None
@@ -0,0 +1,74 @@
+"""
+basespec
+========
+
+Hand-written base document merged with generated spec. ::
+
+    base_spec = BaseSpec('swagger.base.json')
+    swagger = base_spec.merge(generated)
+
+"""
+import os
+import threading
+import time
+
+from .files import FileCache, file_cache, stat_file
+from .utils import freeze, merge_shared
+
+
+class BaseSpec(object):
+    """
+    Base swagger document in JSON file, for fields that are not generated
+    like `definitions`, `securityDefinitions` and shared `responses`.
+
+    The file is parsed once per modification, and merged into generated
+    spec by :func:`~.utils.merge_shared`, so parts of the base that are not
+    generated are never copied. They are frozen by :func:`~.utils.freeze`,
+    so that mutating merged spec fails instead of leaking into later
+    merges.
+
+    :param path: path of JSON file.
+    :param cache: cache of parsed files, default is
+                  :data:`.files.file_cache`.
+
+    """
+    def __init__(self, path: str, cache: FileCache=None):
+        self.path = os.path.abspath(path)
+        self.cache = cache or file_cache
+        self._version = None
+        #: Tuple of last loaded document and its frozen copy
+        self._frozen = None
+        self._checked = None
+        self._lock = threading.Lock()
+
+    def version(self, interval=0.0):
+        """
+        Token that changes whenever the file is modified.
+
+        :param interval: seconds to reuse result of last check.
+
+        """
+        now = time.monotonic()
+        checked = self._checked
+        if checked is not None and now - checked < interval:
+            return self._version
+        with self._lock:
+            self._version = stat_file(self.path)
+            self._checked = now
+            return self._version
+
+    def load(self) -> dict:
+        """Load parsed document, frozen once per modification."""
+        loaded = self.cache.get(self.path)
+        frozen = self._frozen
+        if frozen is None or frozen[0] is not loaded:
+            frozen = self._frozen = (loaded, freeze(loaded))
+        return frozen[1]
+
+    def merge(self, swagger: dict) -> dict:
+        """
+        Merge generated `swagger` into the base. Fields of generated spec
+        take precedence.
+
+        """
+        return merge_shared(self.load(), swagger)
@@ -0,0 +1,191 @@
+"""
+cache
+=====
+
+Caching utilities for generated swagger spec.
+
+"""
+import contextlib
+import mmap
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class SpecCache(object):
+    """
+    Cache for values derived from swagger spec of an app.
+
+    Every value is bound to a *spec version*, a cheap token that changes
+    whenever the spec may change (see
+    :meth:`flask_swag.Swag.get_spec_version`). All cached values are dropped
+    at once when the version changes. ::
+
+        cache = SpecCache()
+        spec = cache.get(version, 'swagger', generate)
+
+    """
+    def __init__(self):
+        self._state = (None, {})
+
+    @property
+    def version(self):
+        """Spec version of currently cached values."""
+        return self._state[0]
+
+    def get(self, version, key, factory):
+        """
+        Get cached value for `key`, or make it by calling `factory`.
+
+        :param version: current spec version.
+        :param key: hashable key of the value.
+        :param factory: function without arguments that makes the value.
+
+        """
+        state = self._state
+        if state[0] != version:
+            # Swap the whole state at once, so that concurrent readers
+            # never see values of mixed versions.
+            state = self._state = (version, {})
+        values = state[1]
+        try:
+            return values[key]
+        except KeyError:
+            value = values[key] = factory()
+            return value
+
+    def clear(self):
+        """Drop all cached values."""
+        self._state = (None, {})
+
+
+class SharedFileCache(object):
+    """
+    Cache of encoded spec shared between processes through files.
+
+    The first process that generates a value writes it to a temporary file
+    and atomically renames it to ``<key>.<suffix>``. Other processes memory
+    map the file, so the content is shared in the page cache. Generation is
+    serialized with a lock file where :mod:`fcntl` is available.
+
+    Whenever a file is stored, files except the most recently stored `keep`
+    ones are removed, so the directory does not grow as spec changes.
+
+    :param directory: directory of cache files.
+    :param keep: number of files to keep.
+
+    """
+    def __init__(self, directory: str, suffix='json', keep=8):
+        self.directory = directory
+        self.suffix = suffix
+        self.keep = keep
+
+    def path_of(self, key: str) -> str:
+        return os.path.join(self.directory,
+                            '{}.{}'.format(key, self.suffix))
+
+    def load(self, key: str) -> mmap.mmap:
+        """Memory map cached file of `key`, or :const:`None`."""
+        try:
+            with open(self.path_of(key), 'rb') as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            # ValueError: empty file cannot be mapped
+            return None
+
+    def store(self, key: str, data: bytes):
+        """Write `data` for `key` atomically."""
+        fd, temp_path = tempfile.mkstemp(dir=self.directory,
+                                         prefix='.{}.'.format(key))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self.path_of(key))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self.evict(key)
+
+    def evict(self, current: str):
+        """Remove files except `current` and most recently stored ones."""
+        extension = '.' + self.suffix
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith('.') or not name.endswith(extension):
+                    continue
+                key = name[:-len(extension)]
+                if key == current:
+                    continue
+                try:
+                    entries.append((entry.stat().st_mtime_ns, key))
+                except FileNotFoundError:
+                    continue
+        entries.sort(reverse=True)
+        for _, key in entries[max(self.keep - 1, 0):]:
+            self.remove(key)
+
+    def remove(self, key: str):
+        """
+        Remove file of `key` and its lock file. Processes that mapped the
+        file keep their mapping.
+
+        """
+        path = self.path_of(key)
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        lock_path = path + '.lock'
+        if fcntl is None:
+            return
+        try:
+            f = open(lock_path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                # Being generated by another process
+                return
+            try:
+                os.unlink(lock_path)
+            except FileNotFoundError:
+                pass
+
+    @contextlib.contextmanager
+    def lock(self, key: str):
+        """Exclusive lock between processes for generation of `key`."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.path_of(key) + '.lock', 'wb') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def get(self, key: str, factory) -> mmap.mmap:
+        """
+        Get mapped content of `key`, or generate it by calling `factory`
+        that returns bytes.
+
+        """
+        data = self.load(key)
+        if data is not None:
+            return data
+        os.makedirs(self.directory, exist_ok=True)
+        with self.lock(key):
+            # Another process may have generated while waiting for lock
+            data = self.load(key)
+            if data is None:
+                self.store(key, factory())
+                data = self.load(key)
+        return data
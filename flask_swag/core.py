@@ -5,12 +5,44 @@ core
 Core API for swagger.
 
 """
-import marshmallow
+import collections.abc
+import sys
+import weakref
 
-from . import schemas
+from .utils import FrozenDict
 
+#: Cache of schema instances by name
+_schemas = {}
+
+#: Fields whose values are few distinct strings, interned by factories
+INTERNED_FIELDS = frozenset([
+    'type', 'format', 'in_', 'name', 'collection_format', 'discriminator',
+])
+
+#: Shared instances made by :func:`flyweight`
+_flyweights = weakref.WeakValueDictionary()
+
+
+def get_schema(name: str):
+    """
+    Get shared instance of schema class in :mod:`.schemas` by name.
+
+    Schemas (and marshmallow) are imported on first use, so that importing
+    Flask-Swag stays cheap for processes that never generate spec.
+
+    """
+    try:
+        return _schemas[name]
+    except KeyError:
+        from . import schemas
+        schema = _schemas[name] = getattr(schemas, name)()
+        return schema
+
+
+def inspect_schema(schema):
+    """Get required field names, default values and fields of schema."""
+    import marshmallow
 
-def make_dict_factory(schema):
     requireds = []
     defaults = {}
     fields = schema.fields
@@ -20,8 +52,73 @@ def make_dict_factory(schema):
             requireds.append(name)
         if field.default is not marshmallow.missing:
             defaults[name] = field.default
+    return requireds, defaults, fields
+
+
+def intern_fields(kwargs: dict) -> dict:
+    """Intern string values of :data:`INTERNED_FIELDS` in place."""
+    for key in INTERNED_FIELDS.intersection(kwargs):
+        value = kwargs[key]
+        if type(value) is str:
+            kwargs[key] = sys.intern(value)
+    return kwargs
+
+
+def flyweight(value: dict) -> dict:
+    """
+    Get shared immutable :class:`~.utils.FrozenDict` that is equal to
+    `value`, so structurally identical objects are stored once. Objects
+    containing unhashable values (like lists) are not shared, and returned
+    as a mutable copy.
+
+    """
+    try:
+        # Type is a part of key, because `True == 1`
+        key = tuple(sorted((key, type(item), item)
+                           for key, item in value.items()))
+        hash(key)
+    except TypeError:
+        return dict(value)
+    shared = _flyweights.get(key)
+    if shared is None:
+        shared = _flyweights.setdefault(key, FrozenDict(value))
+    return shared
+
+
+def share_parameters(operation: dict) -> dict:
+    """
+    Replace parameters of dumped `operation` with :func:`flyweight`
+    instances in place, so identical parameters of many operations (like
+    path parameters) are stored once in cached spec. Use
+    :meth:`~.utils.FrozenDict.copy` to modify them.
+
+    """
+    parameters = operation.get('parameters')
+    if parameters:
+        operation['parameters'] = [flyweight(parameter)
+                                   for parameter in parameters]
+    return operation
+
+
+def make_dict_factory(schema):
+    """
+    Make dict factory that validates arguments with `schema`.
+
+    `schema` can be either a schema instance or a name of schema in
+    :mod:`.schemas`. Named schema is loaded at the first call of factory.
+
+    """
+    inspected = None
 
     def factory(**kwargs):
+        nonlocal inspected
+        if inspected is None:
+            if isinstance(schema, str):
+                inspected = inspect_schema(get_schema(schema))
+            else:
+                inspected = inspect_schema(schema)
+        requireds, defaults, fields = inspected
+
         strict = kwargs.pop('_strict', True)
         for key, value in defaults.items():
             kwargs.setdefault(key, value)
@@ -36,52 +133,131 @@ def make_dict_factory(schema):
                     raise TypeError("Unexpected argument \"{key}\""
                                     .format(key=key))
 
+        intern_fields(kwargs)
         return dict(kwargs)
     return factory
 
 
 #: Description of external documentation
-ExternalDocumentation = make_dict_factory(
-    schemas.ExternalDocumentationSchema())
+ExternalDocumentation = make_dict_factory('ExternalDocumentationSchema')
 
 #: Basic schema info
-Schema = make_dict_factory(schemas.SchemaSchema())
+Schema = make_dict_factory('SchemaSchema')
 
 #: License info
-License = make_dict_factory(schemas.LicenseSchema())
+License = make_dict_factory('LicenseSchema')
 
 #: Contact info
-Contact = make_dict_factory(schemas.ContactSchema())
+Contact = make_dict_factory('ContactSchema')
 
 #: Swagger metadata
-Info = make_dict_factory(schemas.InfoSchema())
+Info = make_dict_factory('InfoSchema')
 
 #: Description of items
-Items = make_dict_factory(schemas.ItemsSchema())
+Items = make_dict_factory('ItemsSchema')
 
 #: Header info
-Header = make_dict_factory(schemas.HeaderSchema())
+Header = make_dict_factory('HeaderSchema')
 
 #: Parameter info
-Parameter = make_dict_factory(schemas.ParameterSchema())
+Parameter = make_dict_factory('ParameterSchema')
 
 #: Description of responses of operation
-Response = make_dict_factory(schemas.ResponseSchema())
+Response = make_dict_factory('ResponseSchema')
 
 #: Operations for each method in PathItem
-Operation = make_dict_factory(schemas.OperationSchema())
+Operation = make_dict_factory('OperationSchema')
 
 #: Items for each path
-PathItem = make_dict_factory(schemas.PathItemSchema())
+PathItem = make_dict_factory('PathItemSchema')
 
 #: Swagger root object
-Swagger = make_dict_factory(schemas.SwaggerSchema())
+Swagger = make_dict_factory('SwaggerSchema')
+
+
+class LazyMapping(collections.abc.Mapping):
+    """
+    Read-only mapping whose content is computed by `factory` on first
+    access, e.g. dumped operation that is extracted only when it is
+    serialized or queried.
+
+    """
+    __slots__ = ('_factory', '_value')
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._value = None
+
+    @property
+    def value(self) -> dict:
+        """Computed content."""
+        value = self._value
+        if value is None:
+            value = self._value = self._factory()
+            self._factory = None
+        return value
+
+    @property
+    def computed(self) -> bool:
+        """Whether the content is computed."""
+        return self._value is not None
+
+    def __getitem__(self, key):
+        return self.value[key]
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __repr__(self):
+        if self._value is None:
+            return 'LazyMapping(<not computed>)'
+        return 'LazyMapping({!r})'.format(self._value)
+
+
+class RawJSON(object):
+    """
+    Pre-encoded JSON fragment, for large static values like `example` and
+    `default`. It passes through :func:`dump` untouched, and is spliced
+    verbatim into encoded spec. ::
+
+        Schema(type='object', example=RawJSON(EXAMPLE_JSON))
+
+    Only fields of free-form values accept it.
+
+    :param data: encoded JSON, either str or bytes.
+
+    """
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.data = data
+
+    def decode(self):
+        """Decode the fragment."""
+        import json
+        return json.loads(self.data.decode('utf-8'))
+
+    def __eq__(self, other):
+        return isinstance(other, RawJSON) and self.data == other.data
+
+    def __hash__(self):
+        return hash(self.data)
+
+    def __repr__(self):
+        return 'RawJSON({!r})'.format(self.data)
 
 
-def dump(swagger, schema=schemas.SwaggerSchema()):
+def dump(swagger, schema=None):
     """
     Dump swagger dict to swagger JSON spec
     """
+    if schema is None:
+        schema = get_schema('SwaggerSchema')
     return schema.dump(swagger).data
 
 
@@ -0,0 +1,172 @@
+"""
+delta
+=====
+
+Changes between versions of swagger spec.
+
+Each version is remembered only by content hashes of its parts, that is
+path items and other top level fields. Changes are computed from the hashes
+and values of the current spec. ::
+
+    history = SpecHistory()
+    history.record(etag, lambda: spec_hashes(swagger))
+    patch = history.make_patch(old_etag, etag, swagger)
+
+"""
+import collections
+import hashlib
+import threading
+
+from .fingerprint import stable_dumps
+from .utils import escape_pointer, unescape_pointer
+
+
+def content_hash(value) -> str:
+    """Hash of canonical JSON of value."""
+    data = stable_dumps(value).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def spec_hashes(swagger: dict) -> dict:
+    """
+    Hash parts of dumped spec.
+
+    :returns: map of JSON pointer of each path item & other top level
+              field to its content hash.
+
+    """
+    hashes = {}
+    for key, value in swagger.items():
+        if key == 'paths':
+            continue
+        hashes['/' + escape_pointer(str(key))] = content_hash(value)
+    for path, item in (swagger.get('paths') or {}).items():
+        hashes['/paths/' + escape_pointer(path)] = content_hash(item)
+    return hashes
+
+
+def resolve_pointer(swagger: dict, pointer: str):
+    """Get value of part of spec by JSON pointer, e.g. made by
+    :func:`spec_hashes`."""
+    value = swagger
+    for token in pointer.split('/')[1:]:
+        token = unescape_pointer(token)
+        try:
+            if isinstance(value, (list, tuple)):
+                value = value[int(token)]
+            elif token in value:
+                value = value[token]
+            else:
+                # Status codes of responses may be integer keys
+                value = value[int(token)]
+        except (KeyError, IndexError, TypeError, ValueError):
+            raise KeyError(pointer)
+    return value
+
+
+def compare_hashes(old: dict, new: dict):
+    """
+    Compare hashes of two versions.
+
+    :returns: tuple of sorted lists of added, changed & removed pointers.
+
+    """
+    added = sorted(pointer for pointer in new if pointer not in old)
+    changed = sorted(pointer for pointer, value in new.items()
+                     if pointer in old and old[pointer] != value)
+    removed = sorted(pointer for pointer in old if pointer not in new)
+    return added, changed, removed
+
+
+class SpecHistory(object):
+    """
+    Ring buffer of hashes of recent spec versions by ETag.
+
+    :param size: number of versions to remember.
+
+    """
+    def __init__(self, size=16):
+        self.versions = collections.OrderedDict()
+        self.size = size
+        self._lock = threading.Lock()
+
+    def record(self, etag: str, make_hashes):
+        """
+        Remember version `etag`. `make_hashes` is called only if the version
+        is new.
+
+        """
+        if etag in self.versions:
+            return
+        hashes = make_hashes()
+        with self._lock:
+            self.versions[etag] = hashes
+            while len(self.versions) > self.size:
+                self.versions.popitem(last=False)
+
+    def compare(self, since: str, etag: str):
+        """
+        Compare version `since` with `etag`.
+
+        :returns: result of :func:`compare_hashes`, or :const:`None` if
+                  either of versions is not remembered.
+
+        """
+        old = self.versions.get(since)
+        new = self.versions.get(etag)
+        if old is None or new is None:
+            return None
+        return compare_hashes(old, new)
+
+    def make_patch(self, since: str, etag: str, swagger) -> list:
+        """
+        Make JSON Patch (RFC 6902) that turns version `since` into `etag`,
+        whose spec is `swagger`.
+
+        :param swagger: spec of `etag`, or function that returns it. The
+                        function is called only if any part is added or
+                        changed.
+        :returns: list of operations, or :const:`None` if `since` is not
+                  remembered.
+
+        """
+        compared = self.compare(since, etag)
+        if compared is None:
+            return None
+        added, changed, removed = compared
+        if callable(swagger):
+            swagger = swagger() if added or changed else {}
+        patch = [{'op': 'remove', 'path': pointer} for pointer in removed]
+        patch.extend({'op': 'add', 'path': pointer,
+                      'value': resolve_pointer(swagger, pointer)}
+                     for pointer in added)
+        patch.extend({'op': 'replace', 'path': pointer,
+                      'value': resolve_pointer(swagger, pointer)}
+                     for pointer in changed)
+        return patch
+
+    def make_changes(self, since: str, etag: str) -> dict:
+        """
+        List changed & removed paths and top level fields since `since`.
+
+        :returns: dict of ``changed``, ``removed`` paths and ``fields``, or
+                  :const:`None` if `since` is not remembered.
+
+        """
+        compared = self.compare(since, etag)
+        if compared is None:
+            return None
+        added, changed, removed = compared
+
+        def paths(pointers):
+            return [unescape_pointer(pointer[len('/paths/'):])
+                    for pointer in pointers if pointer.startswith('/paths/')]
+
+        return {
+            'changed': paths(added + changed),
+            'removed': paths(removed),
+            'fields': sorted(
+                unescape_pointer(pointer[1:])
+                for pointer in added + changed + removed
+                if not pointer.startswith('/paths/')),
+        }
@@ -0,0 +1,283 @@
+"""
+encoding
+========
+
+Encoding of swagger spec into bytes.
+
+"""
+import collections
+import collections.abc
+import functools
+import hashlib
+import importlib
+import json
+import uuid
+
+from .core import RawJSON
+
+#: Fields whose empty values mean the same as absence
+EMPTY_FIELDS = frozenset(['parameters', 'tags', 'headers', 'definitions',
+                          'securityDefinitions', 'required'])
+
+#: Fields whose empty values mean the same as absence only in root object,
+#: because they override root object in operations
+ROOT_EMPTY_FIELDS = frozenset(['schemes', 'consumes', 'produces', 'security'])
+
+#: Fields whose keys are names, not fields of spec
+NAMED_FIELDS = frozenset(['paths', 'definitions', 'properties', 'parameters',
+                          'responses', 'headers', 'securityDefinitions'])
+
+#: Fields whose values are data, not a part of spec
+DATA_FIELDS = frozenset(['default', 'example', 'examples', 'enum'])
+
+#: Encoded spec. `hashes` are :func:`.delta.spec_hashes` of full spec, if
+#: they are computed when it is encoded.
+Encoded = collections.namedtuple('Encoded',
+                                 ['data', 'mimetype', 'etag', 'hashes'])
+Encoded.__new__.__defaults__ = (None,)
+
+
+def compact_dumps(obj) -> str:
+    """Dump JSON with stdlib, without whitespaces."""
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+
+def _orjson_dumps(orjson):
+    # Status codes of responses are integer keys
+    return functools.partial(orjson.dumps, option=orjson.OPT_NON_STR_KEYS)
+
+
+#: Adapters for encoder modules whose `dumps` needs options
+MODULE_ADAPTERS = {
+    'orjson': _orjson_dumps,
+}
+
+
+def get_dumps(encoder=None):
+    """
+    Resolve JSON encoder.
+
+    :param encoder: any `dumps` compatible callable that returns either
+                    str or bytes, or name of module that has `dumps` like
+                    ``'orjson'`` or ``'ujson'``. If it is :const:`None` or
+                    the module is not installed, :func:`compact_dumps` is
+                    used.
+
+    """
+    if encoder is None:
+        return compact_dumps
+    if isinstance(encoder, str):
+        try:
+            module = importlib.import_module(encoder)
+        except ImportError:
+            return compact_dumps
+        adapter = MODULE_ADAPTERS.get(encoder)
+        if adapter is not None:
+            return adapter(module)
+        return module.dumps
+    return encoder
+
+
+def minify(value, parent=None, root=True):
+    """
+    Drop fields that are :const:`None` from dumped spec, and empty fields
+    that mean the same as absence (see :data:`EMPTY_FIELDS`). Values of data
+    fields like `default` and `example` are kept as is.
+
+    :param parent: name of field that has `value`.
+    :param root: whether `value` is root object.
+
+    """
+    if isinstance(value, collections.abc.Mapping):
+        # Keys of named objects are not fields, e.g. response `default`
+        named = parent in NAMED_FIELDS
+        minified = {}
+        for key, item in value.items():
+            if key in DATA_FIELDS and not named:
+                minified[key] = item
+                continue
+            if item is None:
+                continue
+            item = minify(item, None if named else key, False)
+            if not named and not item and isinstance(item, (dict, list)) \
+                    and (key in EMPTY_FIELDS or
+                         root and key in ROOT_EMPTY_FIELDS):
+                continue
+            minified[key] = item
+        return minified
+    if isinstance(value, (list, tuple)):
+        return [minify(item, None, False) for item in value]
+    return value
+
+
+def _parameter_key(parameter):
+    return str(parameter.get('in', '')), str(parameter.get('name', ''))
+
+
+def canonicalize(value, key=None):
+    """
+    Make canonical form of dumped spec whose encoding is byte-stable.
+
+    Keys of objects are converted to string & sorted, so paths, methods
+    and response codes are sorted. `parameters` are sorted by location &
+    name, and `required` lists are sorted. Values of data fields like
+    `example` are kept as is.
+
+    """
+    if isinstance(value, collections.abc.Mapping):
+        # Keys of named objects are not fields, e.g. response `default`
+        named = key in NAMED_FIELDS
+        items = sorted(((str(k), v) for k, v in value.items()),
+                       key=lambda item: item[0])
+        return {k: v if k in DATA_FIELDS and not named
+                else canonicalize(v, None if named else k)
+                for k, v in items}
+    if isinstance(value, (list, tuple)):
+        items = [canonicalize(item) for item in value]
+        if key == 'parameters':
+            if all(isinstance(item, collections.abc.Mapping)
+                   for item in items):
+                items.sort(key=_parameter_key)
+        elif key == 'required':
+            items.sort(key=str)
+        return items
+    return value
+
+
+def make_etag(data: bytes) -> str:
+    """Make strong ETag from content."""
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def dumps_json(obj, dumps=compact_dumps) -> bytes:
+    """
+    Encode JSON with `dumps`, splicing :class:`.core.RawJSON` fragments
+    verbatim. Fragments are replaced with placeholder strings before
+    encoding, so any JSON encoder works. Mappings like
+    :class:`.core.LazyMapping` are converted to dicts.
+
+    """
+    fragments = []
+    prefix = '__swag_raw_{}_'.format(uuid.uuid4().hex)
+
+    def substitute(value):
+        if isinstance(value, RawJSON):
+            fragments.append(value.data)
+            return '{}{}__'.format(prefix, len(fragments) - 1)
+        if isinstance(value, collections.abc.Mapping):
+            return {key: substitute(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [substitute(item) for item in value]
+        return value
+
+    obj = substitute(obj)
+    data = dumps(obj)
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    if not fragments:
+        return data
+    chunks = data.split('"{}'.format(prefix).encode('ascii'))
+    spliced = [chunks[0]]
+    for chunk in chunks[1:]:
+        index, rest = chunk.split(b'__"', 1)
+        spliced.append(fragments[int(index)])
+        spliced.append(rest)
+    return b''.join(spliced)
+
+
+def encode(obj, dumps, mimetype: str, minified=False,
+           canonical=False) -> Encoded:
+    """
+    Encode spec with `dumps` that returns either str or bytes.
+    :class:`.core.RawJSON` fragments are decoded for formats other than
+    JSON.
+
+    :param minified: drop empty fields, see :func:`minify`
+    :param canonical: encode canonical form, see :func:`canonicalize`
+
+    """
+    if minified:
+        obj = minify(obj)
+    if canonical:
+        obj = canonicalize(obj)
+    if mimetype == 'application/json':
+        data = dumps_json(obj, dumps)
+    else:
+        data = dumps(plain(obj))
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+    return Encoded(data=data, mimetype=mimetype, etag=make_etag(data))
+
+
+def encode_json(obj, dumps=compact_dumps, minified=False,
+                canonical=False) -> Encoded:
+    """
+    Encode spec to JSON.
+
+    :param dumps: JSON encoder, see :func:`get_dumps`
+
+    """
+    return encode(obj, dumps, 'application/json', minified, canonical)
+
+
+def plain(value):
+    """
+    Convert mappings & tuples in dumped spec to dicts & lists, and decode
+    :class:`.core.RawJSON` fragments.
+
+    """
+    if isinstance(value, RawJSON):
+        return value.decode()
+    if isinstance(value, collections.abc.Mapping):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    return value
+
+
+def _msgpack_dumps():
+    import msgpack
+    return functools.partial(msgpack.packb, use_bin_type=True)
+
+
+def _cbor_dumps():
+    import cbor2
+    return cbor2.dumps
+
+
+def _yaml_dumps():
+    import yaml
+
+    def dumps(obj):
+        return yaml.safe_dump(obj, default_flow_style=False,
+                              allow_unicode=True)
+    return dumps
+
+
+#: Map of mimetype to function that makes `dumps` of the format. It may
+#: raise :exc:`ImportError` if the encoder is not installed.
+ENCODERS = collections.OrderedDict([
+    ('application/msgpack', _msgpack_dumps),
+    ('application/x-msgpack', _msgpack_dumps),
+    ('application/cbor', _cbor_dumps),
+    ('application/yaml', _yaml_dumps),
+    ('application/x-yaml', _yaml_dumps),
+    ('text/yaml', _yaml_dumps),
+])
+
+
+def resolve_encoders(encoders: dict) -> collections.OrderedDict:
+    """
+    Make `dumps` of formats whose encoders are installed.
+
+    :param encoders: map like :data:`ENCODERS`
+    :returns: map of mimetype to `dumps`
+
+    """
+    resolved = collections.OrderedDict()
+    for mimetype, make_dumps in encoders.items():
+        try:
+            resolved[mimetype] = make_dumps()
+        except ImportError:
+            continue
+    return resolved
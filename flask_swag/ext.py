@@ -4,14 +4,91 @@ ext
 
 Utilities for optional external libraries.
 
+Converted JSON schemas are cached per schema class (or per instance for
+parametrized or customized marshmallow schemas), so that the same schema
+used by many views is converted only once. Cached results are shared, so
+they are frozen by :func:`~.utils.freeze`.
+
 """
+import sys
+import threading
+import weakref
 
+from .utils import freeze
+
+#: Options of marshmallow schema that change its JSON schema
+MARSHMALLOW_OPTIONS = ('only', 'exclude', 'many', 'context', 'load_only',
+                       'dump_only', 'prefix', 'partial')
+
+#: Instance attributes set by :class:`marshmallow.Schema` itself
+_marshmallow_attributes = None
+
+
+def is_marshmallow_schema(obj):
+    """
+    Check `obj` is a marshmallow schema, without importing marshmallow.
+    If marshmallow is not imported yet, `obj` cannot be a schema.
+
+    """
+    marshmallow = sys.modules.get('marshmallow')
+    if marshmallow is None:
+        return False
+    return isinstance(obj, marshmallow.Schema)
+
+
+class ConvertedSchema(object):
+    """JSON schema converted from external schema & parameters from it."""
+    def __init__(self, json_schema):
+        self.json_schema = freeze(json_schema)
+        self._parameters = {}
+
+    def parameters(self, in_='formData') -> tuple:
+        """Parameters from JSON schema. See
+        :func:`~.core.parameters_from_object_schema`."""
+        try:
+            return self._parameters[in_]
+        except KeyError:
+            from .core import parameters_from_object_schema
+            parameters = self._parameters[in_] = freeze(
+                parameters_from_object_schema(self.json_schema, in_=in_))
+            return parameters
 
-def dump_formencode(formencode_schema):
-    """Dump formencode schema to json schema using [forencode_jsonschema](
-    https://github.com/Hardtack/formencode_jsonschema)
 
+class ConversionCache(object):
     """
+    Cache of converted schemas, weakly keyed by schema.
+
+    :param convert: function that converts schema to JSON schema.
+    :param key: function that gets cache key of schema.
+
+    """
+    def __init__(self, convert, key=None):
+        self.convert = convert
+        self.key = key or (lambda schema: schema)
+        self._converted = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, schema) -> ConvertedSchema:
+        """Get converted schema, converting it if not cached."""
+        key = self.key(schema)
+        try:
+            return self._converted[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Not weakly referenceable or not hashable
+            return ConvertedSchema(self.convert(schema))
+        converted = ConvertedSchema(self.convert(schema))
+        with self._lock:
+            return self._converted.setdefault(key, converted)
+
+    def clear(self):
+        """Drop all cached results."""
+        with self._lock:
+            self._converted.clear()
+
+
+def _convert_formencode(formencode_schema):
     try:
         import formencode_jsonschema
     except ImportError as e:
@@ -20,15 +97,75 @@ def dump_formencode(formencode_schema):
     return formencode_jsonschema.JSONSchema().dump(formencode_schema).data
 
 
-def dump_marshmallow(marshmallow_schema):
-    """
-    Dump marshmallow schema to json schema using [marshmallow-jsonschema](
-    https://github.com/fuhrysteve/marshmallow-jsonschema)
-
-    """
+def _convert_marshmallow(marshmallow_schema):
     try:
         import marshmallow_jsonschema
     except ImportError as e:
         raise ImportError("marshmallow_jsonschema is required to dump "
                           "marshmallow schema.") from e
     return marshmallow_jsonschema.dump(marshmallow_schema)
+
+
+def _get_marshmallow_attributes():
+    global _marshmallow_attributes
+    if _marshmallow_attributes is None:
+        import marshmallow
+        _marshmallow_attributes = frozenset(vars(marshmallow.Schema()))
+    return _marshmallow_attributes
+
+
+def marshmallow_key(marshmallow_schema):
+    """
+    Cache key of marshmallow schema. Schema instances share the key of
+    their class, unless they are parametrized with options like `only`, or
+    customized by their constructor, that is, their fields differ from
+    declared fields of the class or they have unknown attributes.
+
+    """
+    if isinstance(marshmallow_schema, type):
+        return marshmallow_schema
+    for option in MARSHMALLOW_OPTIONS:
+        if getattr(marshmallow_schema, option, None):
+            return marshmallow_schema
+    schema_class = type(marshmallow_schema)
+    declared = getattr(schema_class, '_declared_fields', {})
+    fields = getattr(marshmallow_schema, 'fields', {})
+    if set(fields) != set(declared) or any(
+            type(field) is not type(declared[name])
+            for name, field in fields.items()):
+        return marshmallow_schema
+    if not set(vars(marshmallow_schema)) <= _get_marshmallow_attributes():
+        return marshmallow_schema
+    return schema_class
+
+
+formencode_cache = ConversionCache(_convert_formencode)
+
+marshmallow_cache = ConversionCache(_convert_marshmallow, marshmallow_key)
+
+
+def dump_formencode(formencode_schema):
+    """Dump formencode schema to json schema using [forencode_jsonschema](
+    https://github.com/Hardtack/formencode_jsonschema)
+
+    """
+    return formencode_cache.get(formencode_schema).json_schema
+
+
+def dump_marshmallow(marshmallow_schema):
+    """
+    Dump marshmallow schema to json schema using [marshmallow-jsonschema](
+    https://github.com/fuhrysteve/marshmallow-jsonschema)
+
+    """
+    return marshmallow_cache.get(marshmallow_schema).json_schema
+
+
+def formencode_parameters(formencode_schema, in_='formData') -> tuple:
+    """Get parameters from formencode schema."""
+    return formencode_cache.get(formencode_schema).parameters(in_)
+
+
+def marshmallow_parameters(marshmallow_schema, in_='formData') -> tuple:
+    """Get parameters from marshmallow schema."""
+    return marshmallow_cache.get(marshmallow_schema).parameters(in_)
@@ -8,13 +8,16 @@ Base & default implmentation class of extractor.
 import io
 import inspect
 import collections
+import functools
 
 from flask import Flask
 from werkzeug.routing import parse_rule, parse_converter_args
 
-from ..core import PathItem, Operation, Parameter, Response
+from ..core import LazyMapping, PathItem, Operation, Parameter, Response, \
+    dump, get_schema, share_parameters
+from ..files import resolve_files
 from ..utils import get_type_base, TYPE_MAP, parse_endpoint, \
-    merge, normalize_indent
+    merge, normalize_indent, escape_pointer
 
 _MISSING = object()
 
@@ -33,6 +36,8 @@ WerkzeugConverter = collections.namedtuple(
     'WerkzeugConverter', ['converter', 'args', 'kwargs'])
 PathAndParams = collections.namedtuple('PathAndParams', ['path', 'params'])
 PathAndPathItem = collections.namedtuple('PathAndPathItem', ['path', 'item'])
+ExtractedPath = collections.namedtuple('ExtractedPath',
+                                       ['path', 'item', 'endpoints'])
 
 
 class Extractor(object):
@@ -166,9 +171,48 @@ class Extractor(object):
             responses=responses,
         )
         kwargs.update(others)
+        # Load files referenced from marks
+        kwargs = resolve_files(kwargs)
 
         return Operation(**kwargs)
 
+    def operation_key(self, view, params: dict, ctx: dict):
+        """
+        Key of operation, that is same for operations of the same view,
+        method & parameters on different rules. :const:`None` means that the
+        operation should not be shared.
+
+        """
+        try:
+            signature = tuple(sorted(
+                (name, converter.converter, tuple(converter.args),
+                 tuple(sorted(converter.kwargs.items())))
+                for name, converter in params.items()
+            ))
+            key = (view, ctx['method'], ctx['endpoint'], signature)
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def shared_operation(self, view, params: dict, ctx: dict, factory):
+        """
+        Make operation with `factory`, or reuse one made for another rule
+        of the same view in the same extraction. See :meth:`operation_key`.
+
+        """
+        operations = (ctx.get('operations') or {}).get(view)
+        if operations is None:
+            return factory(view, params, ctx)
+        key = self.operation_key(view, params, ctx)
+        if key is None:
+            return factory(view, params, ctx)
+        try:
+            return operations[key]
+        except KeyError:
+            operation = operations[key] = factory(view, params, ctx)
+            return operation
+
     def make_path_item(self, app: Flask, rule: str, endpoints: dict,
                        ctx: dict) -> PathAndPathItem:
         """Make path item from rule and endpoints collected by HTTP methods."""
@@ -176,17 +220,71 @@ class Extractor(object):
         operations = {}
         for method, endpoint in endpoints.items():
             view = app.view_functions[endpoint]
-            operations[method.lower()] = self.make_operation(
+            operations[method.lower()] = self.shared_operation(
                 view, params, merge(ctx, {
                     'endpoint': endpoint,
                     'path': path,
                     'method': method,
-                }))
+                }), self.make_operation)
         return PathAndPathItem(
             path=path,
             item=PathItem(**operations),
         )
 
+    def dump_operation(self, view, params: dict, ctx: dict) -> dict:
+        """
+        Make operation and dump it. Identical parameters are shared, see
+        :func:`~flask_swag.core.share_parameters`.
+
+        """
+        return share_parameters(dump(self.make_operation(view, params, ctx),
+                                     get_schema('OperationSchema')))
+
+    def make_lazy_path_item(self, app: Flask, rule: str, endpoints: dict,
+                            ctx: dict) -> PathAndPathItem:
+        """
+        Make dumped path item whose operations are
+        :class:`~flask_swag.core.LazyMapping`, made & dumped on first
+        access.
+
+        """
+        path, params = self.parse_werkzeug_rule(rule, ctx)
+        item = {}
+        for method, endpoint in endpoints.items():
+            view = app.view_functions[endpoint]
+            item[method.lower()] = self.shared_operation(
+                view, params, merge(ctx, {
+                    'endpoint': endpoint,
+                    'path': path,
+                    'method': method,
+                }), self.make_lazy_operation)
+        return PathAndPathItem(path=path, item=item)
+
+    def make_lazy_operation(self, view, params: dict, ctx: dict):
+        """Make operation that is dumped on first access."""
+        return LazyMapping(functools.partial(self.dump_operation, view,
+                                             params, ctx))
+
+    def path_item_key(self, app: Flask, rule: str, endpoints: dict,
+                      ctx: dict):
+        """
+        Key of path item that is same for rules whose operations are all
+        same, or :const:`None`.
+
+        """
+        path, params = self.parse_werkzeug_rule(rule, ctx)
+        keys = []
+        for method, endpoint in sorted(endpoints.items()):
+            key = self.operation_key(
+                app.view_functions[endpoint], params, {
+                    'endpoint': endpoint,
+                    'method': method,
+                })
+            if key is None:
+                return None
+            keys.append(key)
+        return tuple(keys)
+
     def collect_endpoints(self, app: Flask, blueprint=_MISSING, endpoint=None,
                           exclude_blueprint=_MISSING, exclude_endpoint=None) \
             -> dict:
@@ -235,14 +333,81 @@ class Extractor(object):
                 continue
             methods = rule.methods.difference({'HEAD', 'OPTIONS'})
             method_collection = endpoints.setdefault(rule.rule, {})
-            for method in methods:
+            # Sort methods so that the order does not depend on hash seed
+            for method in sorted(methods):
                 method_collection[method] = rule.endpoint
         return endpoints
 
+    def iter_paths(self, app: Flask, blueprint=_MISSING, endpoint=None,
+                   exclude_blueprint=_MISSING, exclude_endpoint=None,
+                   lazy=False, path_refs=False):
+        """Extract path items from flask app one by one.
+
+        Arguments are same as :meth:`extract_paths`. It yields
+        :class:`ExtractedPath` whose `endpoints` is map of HTTP method to
+        endpoint.
+
+        :param lazy: yield dumped path items of lazy operations. See
+                     :meth:`make_lazy_path_item`.
+
+        """
+        make_path_item = self.make_path_item
+        if lazy:
+            make_path_item = self.make_lazy_path_item
+        endpoints = self.collect_endpoints(app, blueprint, endpoint,
+                                           exclude_blueprint, exclude_endpoint)
+        # Operations are shared only between rules of the same view, so
+        # they are kept only until the last rule of the view is extracted.
+        rule_views = {
+            rule: {app.view_functions[endpoint]
+                   for endpoint in methods.values()}
+            for rule, methods in endpoints.items()
+        }
+        remaining = collections.Counter(
+            view for views in rule_views.values() for view in views)
+        #: Map of view to its operations shared by rules, see
+        #: :meth:`shared_operation`
+        operations = {view: {} for view, count in remaining.items()
+                      if count > 1}
+        #: Map of key of path item to its path
+        item_paths = {}
+
+        def release(rule):
+            for view in rule_views[rule]:
+                remaining[view] -= 1
+                if not remaining[view]:
+                    operations.pop(view, None)
+
+        for rule, methods in endpoints.items():
+            ctx = {
+                'rule': rule,
+                'methods': methods,
+                'app': app,
+                'operations': operations,
+            }
+            if path_refs:
+                key = self.path_item_key(app, rule, methods, ctx)
+                if key is not None and key in item_paths:
+                    path, _ = self.parse_werkzeug_rule(rule, ctx)
+                    ref = '#/paths/' + escape_pointer(item_paths[key])
+                    item = {'$ref': ref} if lazy else PathItem(ref=ref)
+                    release(rule)
+                    yield ExtractedPath(path, item, methods)
+                    continue
+            path, path_item = make_path_item(app, rule, methods, ctx)
+            release(rule)
+            if path_refs and key is not None:
+                item_paths[key] = path
+            yield ExtractedPath(path, path_item, methods)
+
     def extract_paths(self, app: Flask, blueprint=_MISSING, endpoint=None,
-                      exclude_blueprint=_MISSING, exclude_endpoint=None):
+                      exclude_blueprint=_MISSING, exclude_endpoint=None,
+                      path_refs=False):
         """Extract path items from flask app.
 
+        Operations of a view bound to multiple rules are made once and
+        shared.
+
         :param blueprint: name of blueprints to be collected. :const:`None`
                           means non-blueprint endpoints. It cat either be list
                           or string.
@@ -253,17 +418,13 @@ class Extractor(object):
 
         :param exclude_endpoint: endpoint not to be collected.
 
-        """
-        endpoints = self.collect_endpoints(app, blueprint, endpoint,
-                                           exclude_blueprint, exclude_endpoint)
+        :param path_refs: emit path items that are same as previous one as
+                          `$ref` to it.
 
+        """
         paths = {}
-        for rule, methods in endpoints.items():
-            ctx = {
-                'rule': rule,
-                'methods': methods,
-                'app': app,
-            }
-            path, path_item = self.make_path_item(app, rule, methods, ctx)
-            paths[path] = path_item
+        for extracted in self.iter_paths(app, blueprint, endpoint,
+                                         exclude_blueprint, exclude_endpoint,
+                                         path_refs=path_refs):
+            paths[extracted.path] = extracted.item
         return paths
@@ -5,28 +5,84 @@ extractor.mark
 Extractor that extracts swagger spec from *marked* view.
 
 """
+import weakref
+
 from .base import Extractor
+from ..mark import get_defaults, get_generation, materialize, merge_defaults
+from ..utils import copy_containers
 
 
 class MarkExtractor(Extractor):
-    def get_mark(self, view):
-        """Get mark object from view function."""
-        return getattr(view, '_swag', {}).copy()
+    def __init__(self):
+        super().__init__()
+        #: Map of view to `{(app id, blueprint): merged mark}`
+        self._merged_marks = weakref.WeakKeyDictionary()
+        self._generation = None
+
+    def get_defaults(self, ctx: dict) -> list:
+        """
+        Get defaults of app & blueprints of endpoint in `ctx`. Defaults of
+        parent blueprints are applied before those of nested ones.
+
+        """
+        app = ctx.get('app')
+        if app is None:
+            return []
+        defaults = [get_defaults(app)]
+        names = ctx.get('endpoint', '').split('.')[:-1]
+        for index in range(1, len(names) + 1):
+            blueprint = app.blueprints.get('.'.join(names[:index]))
+            if blueprint is not None:
+                defaults.append(get_defaults(blueprint))
+        return [default for default in defaults if default]
+
+    def get_mark(self, view, ctx: dict=None):
+        """
+        Get mark object from view function, merged with defaults of app &
+        blueprint if `ctx` is given. Merged marks are cached per view until
+        any mark is changed. Returned mark is a copy, so it can be modified.
+
+        """
+        materialize(view)
+        mark = getattr(view, '_swag', {})
+        defaults = self.get_defaults(ctx or {})
+        if not defaults:
+            return copy_containers(mark)
+        generation = get_generation()
+        cache = getattr(self, '_merged_marks', None)
+        if cache is None or getattr(self, '_generation', None) != generation:
+            cache = self._merged_marks = weakref.WeakKeyDictionary()
+            self._generation = generation
+        key = (id(ctx['app']), ctx['endpoint'].rpartition('.')[0])
+        try:
+            merged_marks = cache[view]
+        except KeyError:
+            merged_marks = cache[view] = {}
+        except TypeError:
+            # Not weak referenceable
+            merged_marks = {}
+        merged = merged_marks.get(key)
+        if merged is None:
+            merged = {}
+            for default in defaults:
+                merged = merge_defaults(merged, default)
+            merged = merged_marks[key] = merge_defaults(merged, mark)
+        return copy_containers(merged)
 
     def extract_others(self, view, ctx: dict):
-        mark = self.get_mark(view)
+        mark = self.get_mark(view, ctx)
         mark.pop('parameters', None)
         mark.pop('responses', None)
         return mark
 
     def build_parameters(self, view, param_info, ctx: dict) -> list:
-        mark = self.get_mark(view)
+        mark = self.get_mark(view, ctx)
         parameters = super().build_parameters(view, param_info, ctx)
         parameters.extend(mark.get('parameters', []))
         return parameters
 
     def extract_responses(self, view, ctx: dict):
-        mark = self.get_mark(view)
+        mark = self.get_mark(view, ctx)
         if 'responses' not in mark:
             return super().extract_responses(view, ctx)
         return mark['responses']
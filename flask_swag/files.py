@@ -0,0 +1,213 @@
+"""
+files
+=====
+
+JSON files referenced from marks, loaded lazily at extraction time. ::
+
+    @mark.response(200, "Users", JSONFile('schemas/users.json', __file__))
+    def user_index():
+        ...
+
+Loaded files are watched by :data:`file_watcher`, so that modified files
+change spec version.
+
+"""
+import collections
+import json
+import os
+import sys
+import threading
+import time
+
+from .core import RawJSON
+
+
+def stat_file(path: str):
+    """Get `(mtime_ns, size)` of file, or :const:`None` if it is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher(object):
+    """
+    Watcher of modification of files, whose :meth:`version` changes when
+    any watched file is modified. Files are checked at most once per given
+    interval, so it is cheap enough to be called for every request.
+
+    """
+    def __init__(self):
+        #: Map of path to `(mtime_ns, size)` when it was loaded
+        self.stats = {}
+        self._version = 0
+        self._checked = None
+        self._lock = threading.Lock()
+
+    def watch(self, path: str, stat=None):
+        """Watch file of `path` whose current stat is `stat`."""
+        if stat is None:
+            stat = stat_file(path)
+        with self._lock:
+            previous = self.stats.get(path, stat)
+            self.stats[path] = stat
+            if previous != stat:
+                self._version += 1
+
+    def version(self, interval=1.0) -> int:
+        """
+        Get version of watched files.
+
+        :param interval: seconds to reuse result of last check.
+
+        """
+        now = time.monotonic()
+        checked = self._checked
+        if checked is not None and now - checked < interval:
+            return self._version
+        with self._lock:
+            self._checked = now
+            for path, stat in list(self.stats.items()):
+                current = stat_file(path)
+                if current != stat:
+                    self.stats[path] = current
+                    self._version += 1
+            return self._version
+
+
+#: Watcher of files loaded by :data:`file_cache`
+file_watcher = FileWatcher()
+
+
+class FileCache(object):
+    """
+    LRU cache of loaded files keyed by path & modification time, so that
+    changed files are loaded again.
+
+    :param size: max number of files to keep.
+    :param watcher: :class:`FileWatcher` of loaded files.
+
+    """
+    def __init__(self, size=128, watcher: FileWatcher=None):
+        self.size = size
+        self.watcher = watcher
+        self._values = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str, raw=False):
+        """Load JSON file, decoded or as :class:`.core.RawJSON` if `raw`."""
+        stat = os.stat(path)
+        if self.watcher is not None:
+            self.watcher.watch(path, (stat.st_mtime_ns, stat.st_size))
+        key = (path, stat.st_mtime_ns, stat.st_size, raw)
+        with self._lock:
+            try:
+                self._values.move_to_end(key)
+                return self._values[key]
+            except KeyError:
+                pass
+        with open(path, 'rb') as f:
+            data = f.read()
+        value = RawJSON(data) if raw else json.loads(data.decode('utf-8'))
+        with self._lock:
+            self._values[key] = value
+            while len(self._values) > self.size:
+                self._values.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+#: Cache shared by :class:`JSONFile`
+file_cache = FileCache(watcher=file_watcher)
+
+
+class JSONFile(object):
+    """
+    Reference to JSON file that can be used as any value of marks, like
+    schema or example. It is loaded when spec is extracted.
+
+    :param path: path of the file. Relative path is resolved from `base`.
+    :param raw: load as :class:`.core.RawJSON`, which is spliced into
+                encoded spec verbatim. Only free-form fields like
+                `example` accept it.
+    :param base: directory, file (like `__file__`) or module name (like
+                 `__name__`) that relative path is resolved from. Default is
+                 the module that creates the reference, found by inspecting
+                 the caller's frame.
+
+    """
+    __slots__ = ('path', 'raw')
+
+    def __init__(self, path: str, raw=False, base: str=None):
+        if not os.path.isabs(path):
+            directory = resolve_base(base) if base is not None else \
+                _caller_directory()
+            if directory:
+                path = os.path.join(directory, path)
+        self.path = os.path.abspath(path)
+        self.raw = raw
+
+    def load(self, cache: FileCache=None):
+        """Load the file through `cache`, default is :data:`file_cache`."""
+        return (cache or file_cache).get(self.path, self.raw)
+
+    def __eq__(self, other):
+        return isinstance(other, JSONFile) and \
+            (self.path, self.raw) == (other.path, other.raw)
+
+    def __hash__(self):
+        return hash((self.path, self.raw))
+
+    def __repr__(self):
+        return 'JSONFile({!r}, raw={!r})'.format(self.path, self.raw)
+
+
+def resolve_base(base: str) -> str:
+    """Get directory of `base` of :class:`JSONFile`."""
+    module = sys.modules.get(base)
+    if module is not None:
+        base = getattr(module, '__file__', None)
+        if base is None:
+            raise ValueError("Module {!r} has no file".format(module))
+    if os.path.isdir(base):
+        return base
+    return os.path.dirname(base)
+
+
+def _caller_directory():
+    # Frame of the code that creates JSONFile
+    try:
+        frame = sys._getframe(2)
+    except (AttributeError, ValueError):
+        return None
+    module_file = frame.f_globals.get('__file__')
+    return os.path.dirname(module_file) if module_file else None
+
+
+def resolve_files(value):
+    """
+    Load :class:`JSONFile` references in value. Containers without
+    references are returned as is.
+
+    """
+    if isinstance(value, JSONFile):
+        return value.load()
+    if isinstance(value, dict):
+        resolved = None
+        for key, item in value.items():
+            loaded = resolve_files(item)
+            if loaded is not item:
+                if resolved is None:
+                    resolved = dict(value)
+                resolved[key] = loaded
+        return value if resolved is None else resolved
+    if isinstance(value, (list, tuple)):
+        items = [resolve_files(item) for item in value]
+        if all(loaded is item for loaded, item in zip(items, value)):
+            return value
+        return items
+    return value
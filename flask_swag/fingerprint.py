@@ -0,0 +1,142 @@
+"""
+fingerprint
+===========
+
+Fingerprints of inputs of swagger spec.
+
+Fingerprints are stable across processes, so that processes that serve the
+same app can share generated spec.
+
+"""
+import hashlib
+import inspect
+import json
+import os
+import types
+
+from .encoding import canonicalize
+from .files import JSONFile
+
+
+def _stable_default(value):
+    """Stable representation of values that JSON does not support."""
+    if isinstance(value, JSONFile):
+        # Changed files change fingerprint
+        try:
+            mtime = os.stat(value.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        return [value.path, value.raw, mtime]
+    if isinstance(value, (set, frozenset)):
+        return sorted(repr(item) for item in value)
+    if isinstance(value, type) or callable(value):
+        return '{}.{}'.format(getattr(value, '__module__', ''),
+                              getattr(value, '__qualname__', repr(value)))
+    if type(value).__repr__ is object.__repr__:
+        # Default representation has address, e.g. sentinels
+        return _stable_default(type(value))
+    # Other representations with addresses are not stable, but it only
+    # prevents sharing spec between processes.
+    return '{}:{!r}'.format(_stable_default(type(value)), value)
+
+
+def stable_dumps(value) -> str:
+    """Dump value to JSON that is stable across processes."""
+    return json.dumps(canonicalize(value), sort_keys=True,
+                      default=_stable_default)
+
+
+def _update_code(digest, code: types.CodeType):
+    digest.update(code.co_code)
+    digest.update(repr((code.co_names, code.co_varnames)).encode('utf-8'))
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _update_code(digest, const)
+        elif isinstance(const, frozenset):
+            # Order of sets depends on hash seed
+            digest.update(repr(sorted(map(repr, const))).encode('utf-8'))
+        else:
+            digest.update(repr(const).encode('utf-8'))
+
+
+def _update_function(digest, function):
+    code = getattr(function, '__code__', None)
+    if code is not None:
+        _update_code(digest, code)
+    # Signature is read by extractors
+    digest.update(stable_dumps([
+        getattr(function, '__annotations__', None),
+        getattr(function, '__defaults__', None),
+        getattr(function, '__kwdefaults__', None),
+    ]).encode('utf-8'))
+
+
+def _class_functions(cls) -> list:
+    return [value for name, value in sorted(vars(cls).items())
+            if inspect.isfunction(value)]
+
+
+def code_digest(view) -> str:
+    """
+    Digest of code & signature of view, including methods of class based
+    views. Decorators are unwrapped with `__wrapped__`.
+
+    """
+    functions = [inspect.unwrap(view)]
+    view_class = getattr(view, 'view_class', None)
+    if view_class is not None:
+        functions.extend(_class_functions(view_class))
+    digest = hashlib.sha256()
+    for function in functions:
+        _update_function(digest, function)
+    return digest.hexdigest()
+
+
+def class_digest(cls) -> str:
+    """
+    Digest of names and code of methods of class & its bases, e.g. of
+    custom extractor.
+
+    """
+    digest = hashlib.sha256()
+    for base in cls.__mro__:
+        if base is object:
+            continue
+        digest.update(_stable_default(base).encode('utf-8'))
+        for function in _class_functions(base):
+            _update_function(digest, function)
+    return digest.hexdigest()
+
+
+def get_marks(view) -> list:
+    """Get marks of view including deferred ones, without building them."""
+    deferred = [(name, args, kwargs) for mark, name, args, kwargs
+                in getattr(view, '_swag_deferred', None) or ()]
+    return [getattr(view, '_swag', None), deferred]
+
+
+def fingerprint_app(app, *extras) -> str:
+    """
+    Fingerprint rules, endpoints, docstrings, code & marks of views,
+    shared marks of app & blueprints, and `extras`.
+
+    """
+    digest = hashlib.sha256()
+
+    def update(value):
+        digest.update(stable_dumps(value).encode('utf-8'))
+        digest.update(b'\0')
+
+    for rule in app.url_map.iter_rules():
+        update([rule.rule, rule.endpoint, sorted(rule.methods or ())])
+    for endpoint in sorted(app.view_functions):
+        view = app.view_functions[endpoint]
+        update([endpoint, getattr(view, '__doc__', None), code_digest(view),
+                get_marks(view)])
+    update([getattr(app, '_swag_defaults', None), [
+        (name, getattr(blueprint, '_swag_defaults', None))
+        for name, blueprint in sorted(app.blueprints.items())
+    ]])
+    for extra in extras:
+        update(extra)
+    return digest.hexdigest()
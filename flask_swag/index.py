@@ -0,0 +1,256 @@
+"""
+index
+=====
+
+Lookup indexes over dumped swagger spec.
+
+"""
+import collections
+import threading
+
+from .utils import unescape_pointer
+
+#: Keys of path item object that are operations.
+HTTP_METHODS = ('get', 'put', 'post', 'delete', 'options', 'head', 'patch')
+
+#: Prefix of `$ref` to another path item.
+PATHS_POINTER = '#/paths/'
+
+
+def split_path(path: str) -> list:
+    """Split swagger path into segments. Leading slash is ignored."""
+    stripped = path.lstrip('/')
+    if not stripped:
+        return []
+    return stripped.split('/')
+
+
+class PathTrie(object):
+    """
+    Prefix trie over segments of swagger paths.
+
+    Prefixes are matched by whole segments, so prefix ``/users`` matches
+    ``/users/`` and ``/users/{user_id}`` but not ``/usersettings``.
+
+    """
+    def __init__(self):
+        self.children = {}
+        self.paths = []
+
+    def insert(self, path: str):
+        """Insert a path."""
+        node = self
+        for segment in split_path(path):
+            node = node.children.setdefault(segment, PathTrie())
+        node.paths.append(path)
+
+    def iter_paths(self):
+        """Iterate all paths under this node."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield from node.paths
+            stack.extend(node.children.values())
+
+    def find(self, prefix: str) -> list:
+        """Find all paths starting with `prefix`."""
+        node = self
+        # Trailing slash of prefix does not narrow down the result
+        for segment in split_path(prefix.rstrip('/')):
+            node = node.children.get(segment)
+            if node is None:
+                return []
+        return list(node.iter_paths())
+
+
+class SpecIndex(object):
+    """
+    Index over dumped swagger paths for partial queries.
+
+    Operations can be queried by path prefix, tags and operation ids.
+    Tags & operation ids are indexed at the first query of them, so prefix
+    queries do not touch other operations. Results of queries are memoized
+    in LRU manner. ::
+
+        index = SpecIndex(swagger['paths'])
+        paths = index.query(prefix='/users', tags=['admin'])
+
+    """
+    def __init__(self, paths: dict, cache_size=128):
+        self.paths = paths
+        self.cache_size = cache_size
+        self.trie = PathTrie()
+        for path in paths:
+            self.trie.insert(path)
+        self._operation_index = None
+        self._results = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _index_operations(self):
+        tags = {}
+        operation_ids = {}
+        for path in self.paths:
+            item = self.get_item(path)
+            for method in HTTP_METHODS:
+                operation = item.get(method)
+                if operation is None:
+                    continue
+                key = (path, method)
+                for tag in operation.get('tags') or ():
+                    tags.setdefault(tag, set()).add(key)
+                operation_id = operation.get('operationId')
+                if operation_id:
+                    operation_ids.setdefault(operation_id, set()).add(key)
+        return tags, operation_ids
+
+    def get_item(self, path: str) -> dict:
+        """Get path item of `path`, following `$ref` to another path."""
+        item = self.paths[path]
+        ref = item.get('$ref')
+        if ref and ref.startswith(PATHS_POINTER):
+            return self.paths[unescape_pointer(ref[len(PATHS_POINTER):])]
+        return item
+
+    @property
+    def tags(self) -> dict:
+        """Map of tag to set of `(path, method)`"""
+        if self._operation_index is None:
+            self._operation_index = self._index_operations()
+        return self._operation_index[0]
+
+    @property
+    def operation_ids(self) -> dict:
+        """Map of operation id to set of `(path, method)`"""
+        if self._operation_index is None:
+            self._operation_index = self._index_operations()
+        return self._operation_index[1]
+
+    def query(self, prefix: str=None, tags=(), operation_ids=()) -> dict:
+        """
+        Query paths with filters.
+
+        Operations that match all of given filters are selected. Multiple
+        tags or operation ids match any of them.
+
+        :param prefix: path prefix.
+        :param tags: list of tags.
+        :param operation_ids: list of operation ids.
+        :returns: paths that only contain selected operations.
+
+        """
+        key = (prefix, frozenset(tags), frozenset(operation_ids))
+        with self._lock:
+            try:
+                self._results.move_to_end(key)
+                return self._results[key]
+            except KeyError:
+                pass
+        result = self._query(prefix, key[1], key[2])
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+        return result
+
+    def _select(self, selected, keys_by_name, names):
+        matched = set()
+        for name in names:
+            matched.update(keys_by_name.get(name, ()))
+        if selected is None:
+            return matched
+        return selected & matched
+
+    def _query(self, prefix, tags, operation_ids) -> dict:
+        selected = None
+        if prefix is not None:
+            selected = set()
+            for path in self.trie.find(prefix):
+                item = self.get_item(path)
+                selected.update((path, method) for method in HTTP_METHODS
+                                if method in item)
+        if tags:
+            selected = self._select(selected, self.tags, tags)
+        if operation_ids:
+            selected = self._select(selected, self.operation_ids,
+                                    operation_ids)
+        if selected is None:
+            return self.paths
+
+        result = {}
+        for path, method in sorted(selected):
+            item = result.get(path)
+            if item is None:
+                # Keep path level fields like `parameters`
+                item = result[path] = {
+                    key: value for key, value in self.get_item(path).items()
+                    if key not in HTTP_METHODS
+                }
+            item[method] = self.get_item(path)[method]
+        return result
+
+
+OperationEntry = collections.namedtuple(
+    'OperationEntry',
+    ['endpoint', 'method', 'path', 'path_item', 'operation', 'metadata'])
+
+
+class OperationMetadata(dict):
+    """
+    Metadata compiled from an operation, computed on first access by
+    compilers registered with name. ::
+
+        entry.metadata['validator']
+
+    """
+    def __init__(self, compilers: dict):
+        super().__init__()
+        self.compilers = compilers
+        self.entry = None
+
+    def __missing__(self, key):
+        value = self[key] = self.compilers[key](self.entry)
+        return value
+
+
+class OperationIndex(object):
+    """
+    Index of dumped operations by `(endpoint, method)`.
+
+    :param operations: iterable of
+                       `(endpoint, method, path, path_item, operation)`
+    :param compilers: map of metadata name to function that compiles
+                      :class:`OperationEntry` to metadata.
+
+    """
+    def __init__(self, operations, compilers: dict=None):
+        compilers = compilers or {}
+        self.entries = {}
+        for endpoint, method, path, item, operation in operations:
+            metadata = OperationMetadata(compilers)
+            entry = metadata.entry = OperationEntry(
+                endpoint=endpoint,
+                method=method,
+                path=path,
+                path_item=item,
+                operation=operation,
+                metadata=metadata,
+            )
+            self.entries.setdefault((endpoint, method), entry)
+
+    def get(self, endpoint: str, method: str) -> OperationEntry:
+        """
+        Get entry of operation. ``HEAD`` falls back to ``GET`` like flask.
+
+        :returns: the entry or :const:`None`
+
+        """
+        entry = self.entries.get((endpoint, method))
+        if entry is None and method == 'HEAD':
+            entry = self.entries.get((endpoint, 'GET'))
+        return entry
+
+    def __iter__(self):
+        return iter(self.entries.values())
+
+    def __len__(self):
+        return len(self.entries)
@@ -5,11 +5,105 @@ mark
 Mark flask view with swagger spec.
 
 """
-from marshmallow import Schema as MaSchema
+import copy
+import functools
+import threading
 
 from . import core, ext
 from .utils import merge, normalize_indent, compose, get_type_base
 
+#: Counter that increases whenever any view is marked.
+_generation = 0
+
+
+def get_generation() -> int:
+    """
+    Get generation of marks. It changes whenever any view is marked, so
+    caches of generated spec can detect stale marks.
+
+    """
+    return _generation
+
+
+def _touch():
+    global _generation
+    _generation += 1
+
+
+_materialize_lock = threading.RLock()
+
+
+def materialize(fn):
+    """
+    Apply deferred marks of lazy :class:`Mark` to view function.
+    Extractors should call this before reading marks.
+
+    """
+    if not getattr(fn, '_swag_deferred', None):
+        return
+    with _materialize_lock:
+        deferred = getattr(fn, '_swag_deferred', None)
+        if not deferred:
+            return
+        fn._swag_deferred = []
+        for mark, name, args, kwargs in deferred:
+            getattr(mark.eager, name)(*args, **kwargs)(fn)
+
+
+def _parameter_key(parameter):
+    return parameter.get('in_', parameter.get('in')), parameter.get('name')
+
+
+def merge_defaults(defaults: dict, swag: dict) -> dict:
+    """
+    Merge shared defaults with marks of a view without mutation.
+
+    Marks of the view take precedence. Objects like `responses` are merged
+    recursively, and `parameters` of defaults are prepended unless the view
+    has parameter with same location & name.
+
+    """
+    merged = dict(defaults)
+    for key, value in swag.items():
+        default = merged.get(key)
+        if key == 'parameters' and default:
+            keys = {_parameter_key(parameter) for parameter in value}
+            merged[key] = [parameter for parameter in default
+                           if _parameter_key(parameter) not in keys]
+            merged[key].extend(value)
+        elif isinstance(default, dict) and isinstance(value, dict):
+            merged[key] = merge_defaults(default, value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def get_defaults(target) -> dict:
+    """Get defaults attached to app or blueprint by :meth:`Mark.defaults`."""
+    return getattr(target, '_swag_defaults', None) or {}
+
+
+def deferrable(method):
+    """
+    Make marking method only record its arguments when mark is lazy.
+    Recorded marks are applied by :func:`materialize`.
+
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.lazy:
+            return method(self, *args, **kwargs)
+        entry = (self, method.__name__, args, kwargs)
+
+        def decorator(fn):
+            if not hasattr(fn, '_swag_deferred'):
+                fn._swag_deferred = []
+            fn._swag_deferred.append(entry)
+            _touch()
+            return fn
+        return decorator
+    return wrapper
+
 
 class Mark(object):
     """
@@ -38,6 +132,14 @@ class Mark(object):
           def create():
               pass
 
+    Marks shared by every view of a blueprint or an app can be attached
+    once with :meth:`defaults` ::
+
+          mark.defaults(users_blueprint, {
+              'tags': ['users'],
+              'produces': ['application/json'],
+          })
+
     You can remove some field from spec by using :meth:`unmark` ::
 
           @app.route('/users/<int:user_id')
@@ -49,40 +151,88 @@ class Mark(object):
           def read(user_id):
               pass
 
+    With ``lazy=True``, decorators only record their arguments, and marks
+    are built when an extractor reads the view for the first time. It makes
+    importing many marked views cheap. Deferred marks are applied after
+    marks of non-lazy marks. ::
+
+          mark = Mark(lazy=True)
+
     """
-    def __init__(self):
+    def __init__(self, lazy=False):
         super().__init__()
+        #: Record marks and build them on first extraction
+        self.lazy = lazy
+        #: Bump generation of marks on changes
+        self.track_changes = True
+        self._eager = None
 
     def __call__(self, spec):
         return self.swag(spec)
 
+    @property
+    def eager(self) -> 'Mark':
+        """Non-lazy copy of this mark, applies deferred marks."""
+        if not self.lazy:
+            return self
+        if self._eager is None:
+            eager = copy.copy(self)
+            eager.lazy = False
+            # Deferred marks were already counted when they are recorded
+            eager.track_changes = False
+            self._eager = eager
+        return self._eager
+
+    def touch(self):
+        """Notify that marks are changed."""
+        if self.track_changes:
+            _touch()
+
     def get_swag(self, fn):
+        materialize(fn)
         if not hasattr(fn, '_swag'):
             fn._swag = {}
         return fn._swag
 
     def set_swag(self, fn, swag):
         fn._swag = swag
+        self.touch()
 
     def update_swag(self, fn, swag):
         self.get_swag(fn).update(swag)
+        self.touch()
         return self.get_swag(fn)
 
     def merge_swag(self, fn, swag):
         self.set_swag(fn, merge(self.get_swag(fn), swag))
 
+    def defaults(self, target, spec: dict):
+        """
+        Attach marks shared by all views of `target`, which is either a
+        blueprint or an app. They are stored once, and merged with marks of
+        each view at extraction time by :func:`merge_defaults`. Defaults of
+        app are applied before defaults of blueprint.
+
+        """
+        target._swag_defaults = merge_defaults(get_defaults(target), spec)
+        _touch()
+        return target
+
+    @deferrable
     def swag(self, spec):
         def decorator(fn):
             self.update_swag(fn, spec)
             return fn
         return decorator
 
+    @deferrable
     def summary(self, summary: str):
         """Mark summary to view."""
         return self.swag({
             'summary': summary
         })
 
+    @deferrable
     def description(self, description: str):
         """Mark description to view."""
         return self.swag({
@@ -102,6 +252,7 @@ class Mark(object):
         summary = description.split('\n', 1)[0].strip()[:120]
         return self.summary(summary)(fn)
 
+    @deferrable
     def parameter(self, parameter):
         """Mark parameter to view"""
         def decorator(fn):
@@ -112,11 +263,18 @@ class Mark(object):
             return fn
         return decorator
 
+    @deferrable
     def schema(self, schema, in_='formData'):
         """Convert json schema to parameter and mark it to view."""
         parameters = core.parameters_from_object_schema(schema, in_=in_)
+        return self.parameters(parameters)
+
+    @deferrable
+    def parameters(self, parameters):
+        """Mark list of parameters to view."""
         return compose(*map(self.parameter, parameters))
 
+    @deferrable
     def response(self, status, response_or_description, schema=None,
                  headers=None):
         """Mark response field for view to view.
@@ -158,7 +316,7 @@ class Mark(object):
                 response['headers'] = headers
         else:
             response = response_or_description
-        if isinstance(response.get('schema', None), MaSchema):
+        if ext.is_marshmallow_schema(response.get('schema', None)):
             response['schema'] = ext.dump_marshmallow(response['schema'])
 
         def decorator(fn):
@@ -169,6 +327,7 @@ class Mark(object):
             return fn
         return decorator
 
+    @deferrable
     def simple_param(self, in_, name, python_type, optional=False, **kwargs):
         """
         Mark parameter with python type that can be converted by
@@ -185,20 +344,26 @@ class Mark(object):
         params.update(kwargs)
         return self.parameter(core.Parameter(**params))
 
+    @deferrable
     def query(self, name, python_type, optional=False, **kwargs):
         """Mark simple query parameter."""
         return self.simple_param('query', name, python_type, optional=optional,
                                  **kwargs)
 
+    @deferrable
     def form(self, name, python_type, optional=False, **kwargs):
         """Mark simple form parameter."""
         return self.simple_param('formData', name, python_type,
                                  optional=optional, **kwargs)
 
+    @deferrable
     def formencode(self, formencode_schema, in_='formData'):
         """Mark formencode schema as parameter."""
-        return self.schema(ext.dump_formencode(formencode_schema), in_=in_)
+        return self.parameters(
+            ext.formencode_parameters(formencode_schema, in_=in_))
 
-    def marshmallow(self, formencode_schema, in_='formData'):
+    @deferrable
+    def marshmallow(self, marshmallow_schema, in_='formData'):
         """Mark marshmallow schema as parameter."""
-        return self.schema(ext.dump_marshmallow(formencode_schema), in_=in_)
+        return self.parameters(
+            ext.marshmallow_parameters(marshmallow_schema, in_=in_))
@@ -0,0 +1,94 @@
+"""
+rebuild
+=======
+
+Regeneration of spec in background.
+
+"""
+import logging
+import threading
+import time
+
+
+class BackgroundRebuilder(object):
+    """
+    Values per key that are rebuilt in a background thread when spec version
+    is changed. Stale values are served until rebuilt values are ready.
+
+    Rebuilding waits until the version stays the same for `delay` seconds,
+    so a burst of rule additions triggers only one rebuild.
+
+    :param build: function that builds value of a key.
+    :param get_version: function that returns current spec version.
+    :param delay: seconds to debounce changes.
+    :param logger: logger for failures of rebuilding.
+
+    """
+    def __init__(self, build, get_version, delay=0.5, logger=None):
+        self.build = build
+        self.get_version = get_version
+        self.delay = delay
+        self.logger = logger or logging.getLogger(__name__)
+        #: Map of key to `(version, value)`
+        self.values = {}
+        self.pending = set()
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def get(self, key, version, factory):
+        """
+        Get value of `key`. It is built by calling `factory` only if there
+        is no value yet, otherwise stale value is returned and rebuilding
+        is scheduled.
+
+        """
+        entry = self.values.get(key)
+        if entry is None:
+            value = factory()
+            self.values[key] = (version, value)
+            return value
+        if entry[0] != version:
+            self.schedule(key)
+        return entry[1]
+
+    def schedule(self, key):
+        """Schedule rebuilding of `key`."""
+        with self.condition:
+            if key in self.pending:
+                return
+            self.pending.add(key)
+            # Thread of parent process does not survive fork
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run,
+                                               name='swag-rebuild',
+                                               daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def wait_stable(self):
+        """Wait until version stays the same for `delay`."""
+        version = self.get_version()
+        while True:
+            time.sleep(self.delay)
+            current = self.get_version()
+            if current == version:
+                return version
+            version = current
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+            version = self.wait_stable()
+            with self.condition:
+                keys, self.pending = self.pending, set()
+            for key in keys:
+                try:
+                    value = self.build(key)
+                except Exception:
+                    # Keep serving last good value
+                    self.logger.exception("Failed to rebuild spec of %r",
+                                          key)
+                    continue
+                self.values[key] = (version, value)
@@ -490,6 +490,9 @@ class PathItemSchema(MappingSchema):
     #: Parameters
     parameters = fields.Nested(ParameterSchema, many=True)
 
+    #: Reference to definition of this path item
+    ref = fields.String(dump_to='$ref')
+
 
 class SwaggerSchema(MappingSchema):
     """
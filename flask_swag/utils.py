@@ -1,3 +1,4 @@
+import collections.abc
 import datetime
 import decimal
 import re
@@ -74,6 +75,16 @@ def parse_endpoint(endpoint):
     return None, endpoint
 
 
+def escape_pointer(token: str) -> str:
+    """Escape reference token of JSON pointer (RFC 6901)."""
+    return token.replace('~', '~0').replace('/', '~1')
+
+
+def unescape_pointer(token: str) -> str:
+    """Unescape reference token of JSON pointer."""
+    return token.replace('~1', '/').replace('~0', '~')
+
+
 def normalize_indent(docstring):
     """
     Normalized indent of docstring.
@@ -129,6 +140,71 @@ def merge(dest, src):
     return src
 
 
+def merge_shared(dest, src):
+    """
+    Merge plain objects like :func:`merge`, but values that exist only in
+    one of them are shared instead of copied, so the cost depends on the
+    overlap only. Lists of `src` replace lists of `dest`, but :const:`None`
+    values of `src` never replace values of `dest`. Any mapping (like
+    :class:`.core.LazyMapping`) is merged as dict. The result shares objects
+    with both, so it must not be mutated.
+
+    """
+    if isinstance(dest, collections.abc.Mapping) and \
+            isinstance(src, collections.abc.Mapping):
+        if not dest:
+            return src
+        if not src:
+            return dest
+        merged = dict(dest)
+        for key, value in src.items():
+            if key in dest:
+                if value is None:
+                    continue
+                value = merge_shared(dest[key], value)
+            merged[key] = value
+        return merged
+    return src
+
+
+class FrozenDict(dict):
+    """
+    Immutable dict for values shared between views. It is still a dict, so
+    it can be dumped & encoded as usual. :meth:`copy` returns mutable dict.
+
+    """
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("'{}' object is immutable"
+                        .format(type(self).__name__))
+
+    __setitem__ = __delitem__ = _immutable
+    clear = pop = popitem = setdefault = update = __ior__ = _immutable
+
+    def copy(self):
+        return dict(self)
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+def freeze(value):
+    """Make plain object immutable recursively. Lists become tuples."""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def copy_containers(value):
+    """Copy plain dicts & lists recursively, other objects are shared."""
+    if type(value) is dict:
+        return {key: copy_containers(item) for key, item in value.items()}
+    if type(value) is list:
+        return [copy_containers(item) for item in value]
+    return value
+
+
 def compose(last, *fn):
     """Compose functions."""
     fn = (last,) + fn
@@ -0,0 +1,446 @@
+"""
+validation
+==========
+
+Validators compiled from dumped swagger spec.
+
+Each parameter list or schema is compiled once into closures that only
+contain checks it actually needs, so that validating a request is much
+cheaper than interpreting JSON schema for every request. ::
+
+    validate = compile_validator(operation['parameters'])
+    values = validate(request)
+
+"""
+import re
+
+_MISSING = object()
+
+#: Separators of `collectionFormat`
+COLLECTION_SEPARATORS = {
+    'csv': ',',
+    'ssv': ' ',
+    'tsv': '\t',
+    'pipes': '|',
+}
+
+_TRUE_VALUES = frozenset(['true', '1'])
+_FALSE_VALUES = frozenset(['false', '0'])
+
+
+class ValidationError(ValueError):
+    """
+    Validation failure.
+
+    :param errors: map of parameter name (or JSON pointer for schema) to
+                   error message.
+
+    """
+    def __init__(self, errors: dict):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def coerce_integer(value):
+    if isinstance(value, bool):
+        raise ValueError("Not an integer")
+    if isinstance(value, int):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError("Not an integer")
+
+
+def coerce_number(value):
+    if isinstance(value, bool):
+        raise ValueError("Not a number")
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError("Not a number")
+
+
+def coerce_boolean(value):
+    if isinstance(value, bool):
+        return value
+    lowered = str(value).lower()
+    if lowered in _TRUE_VALUES:
+        return True
+    if lowered in _FALSE_VALUES:
+        return False
+    raise ValueError("Not a boolean")
+
+
+def coerce_string(value):
+    if isinstance(value, str):
+        return value
+    return str(value)
+
+
+def coerce_file(value):
+    return value
+
+
+#: Coercers for parameter types
+COERCERS = {
+    'integer': coerce_integer,
+    'number': coerce_number,
+    'boolean': coerce_boolean,
+    'string': coerce_string,
+    'file': coerce_file,
+}
+
+
+def compile_checks(spec: dict) -> list:
+    """Compile checks of constraints like `enum` and `minimum`."""
+    checks = []
+    enum = spec.get('enum')
+    if enum is not None:
+        members = list(enum)
+        try:
+            allowed = frozenset(members)
+        except TypeError:
+            allowed = members
+
+        def check_enum(value):
+            try:
+                found = value in allowed
+            except TypeError:
+                # Unhashable value like array
+                found = value in members
+            if not found:
+                raise ValueError("Not one of {!r}".format(members))
+        checks.append(check_enum)
+
+    minimum = spec.get('minimum')
+    if minimum is not None:
+        if spec.get('exclusiveMinimum'):
+            def check_minimum(value):
+                if value <= minimum:
+                    raise ValueError("Must be greater than {}"
+                                     .format(minimum))
+        else:
+            def check_minimum(value):
+                if value < minimum:
+                    raise ValueError("Must be at least {}".format(minimum))
+        checks.append(check_minimum)
+
+    maximum = spec.get('maximum')
+    if maximum is not None:
+        if spec.get('exclusiveMaximum'):
+            def check_maximum(value):
+                if value >= maximum:
+                    raise ValueError("Must be less than {}".format(maximum))
+        else:
+            def check_maximum(value):
+                if value > maximum:
+                    raise ValueError("Must be at most {}".format(maximum))
+        checks.append(check_maximum)
+
+    min_length = spec.get('minLength')
+    if min_length is not None:
+        def check_min_length(value):
+            if len(value) < min_length:
+                raise ValueError("Shorter than {}".format(min_length))
+        checks.append(check_min_length)
+
+    max_length = spec.get('maxLength')
+    if max_length is not None:
+        def check_max_length(value):
+            if len(value) > max_length:
+                raise ValueError("Longer than {}".format(max_length))
+        checks.append(check_max_length)
+
+    pattern = spec.get('pattern')
+    if pattern is not None:
+        search = re.compile(pattern).search
+
+        def check_pattern(value):
+            if search(value) is None:
+                raise ValueError("Does not match {!r}".format(pattern))
+        checks.append(check_pattern)
+
+    min_items = spec.get('minItems')
+    if min_items is not None:
+        def check_min_items(value):
+            if len(value) < min_items:
+                raise ValueError("Fewer than {} items".format(min_items))
+        checks.append(check_min_items)
+
+    max_items = spec.get('maxItems')
+    if max_items is not None:
+        def check_max_items(value):
+            if len(value) > max_items:
+                raise ValueError("More than {} items".format(max_items))
+        checks.append(check_max_items)
+
+    return checks
+
+
+def _with_checks(convert, checks):
+    if not checks:
+        return convert
+    if len(checks) == 1:
+        check, = checks
+
+        def converter(value):
+            value = convert(value)
+            check(value)
+            return value
+        return converter
+
+    def converter(value):
+        value = convert(value)
+        for check in checks:
+            check(value)
+        return value
+    return converter
+
+
+def compile_converter(spec: dict):
+    """
+    Compile function that coerces raw value of parameter (or items) and
+    checks its constraints. It raises :exc:`ValueError` for invalid value.
+
+    """
+    type_ = spec.get('type', 'string')
+    if type_ == 'array':
+        convert_item = compile_converter(spec.get('items') or {})
+        separator = COLLECTION_SEPARATORS.get(
+            spec.get('collectionFormat', 'csv'))
+
+        def convert(value):
+            if isinstance(value, str):
+                if separator is None:
+                    value = [value]
+                else:
+                    value = value.split(separator) if value else []
+            return [convert_item(item) for item in value]
+    else:
+        convert = COERCERS.get(type_, coerce_string)
+    return _with_checks(convert, compile_checks(spec))
+
+
+def _get_body(request):
+    value = request.get_json(silent=True)
+    return {} if value is None else {'': value}
+
+
+#: Functions that get containers of parameters from request, by `in`
+SOURCES = {
+    'query': lambda request: request.args,
+    'formData': lambda request: request.form,
+    'file': lambda request: request.files,
+    'header': lambda request: request.headers,
+    'path': lambda request: request.view_args or {},
+    'body': _get_body,
+}
+
+
+def _getter(parameter: dict):
+    """
+    Compile function that gets raw value of parameter from its container.
+
+    :returns: tuple of source name in :data:`SOURCES` and the function.
+
+    """
+    name = parameter['name']
+    source = parameter.get('in')
+    if source not in SOURCES:
+        return None, None
+    if source == 'formData' and parameter.get('type') == 'file':
+        source = 'file'
+    if source == 'body':
+        name = ''
+    if parameter.get('type') == 'array' and \
+            parameter.get('collectionFormat') == 'multi':
+        def get(container):
+            return container.getlist(name) or _MISSING
+        return source, get
+
+    def get(container):
+        return container.get(name, _MISSING)
+    return source, get
+
+
+def compile_validator(parameters: list):
+    """
+    Compile validator for list of dumped parameter objects.
+
+    The validator takes a request and returns map of parameter name to
+    coerced value, or raises :exc:`ValidationError` with all errors.
+    Missing optional parameters are omitted unless they have `default`.
+
+    """
+    compiled = []
+    for parameter in parameters:
+        source, get = _getter(parameter)
+        if get is None:
+            continue
+        if source == 'body':
+            convert = compile_schema(parameter.get('schema') or {})
+        else:
+            convert = compile_converter(parameter)
+        compiled.append((
+            parameter['name'],
+            SOURCES[source],
+            get,
+            convert,
+            parameter.get('required', False),
+            parameter.get('default', _MISSING),
+        ))
+    compiled = tuple(compiled)
+
+    def validate(request) -> dict:
+        values = {}
+        errors = None
+        containers = {}
+        for name, source, get, convert, required, default in compiled:
+            try:
+                container = containers[source]
+            except KeyError:
+                container = containers[source] = source(request)
+            raw = get(container)
+            if raw is _MISSING:
+                if required:
+                    errors = errors or {}
+                    errors[name] = "Missing required parameter"
+                elif default is not _MISSING:
+                    values[name] = default
+                continue
+            try:
+                values[name] = convert(raw)
+            except ValidationError as e:
+                errors = errors or {}
+                for pointer, message in e.errors.items():
+                    errors[name + pointer] = message
+            except ValueError as e:
+                errors = errors or {}
+                errors[name] = str(e)
+        if errors:
+            raise ValidationError(errors)
+        return values
+    return validate
+
+
+#: Python types for JSON schema types
+JSON_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'integer': int,
+    'number': (int, float),
+    'boolean': bool,
+    'null': type(None),
+}
+
+
+def compile_schema(schema: dict):
+    """
+    Compile validator for a subset of JSON schema: `type`, `properties`,
+    `required`, `items`, `allOf` and constraints like `enum` & `minimum`.
+    `$ref` is not resolved.
+
+    The validator takes a decoded JSON value, and raises
+    :exc:`ValidationError` whose keys are JSON pointers, or returns the value.
+
+    """
+    checks = []
+    type_ = schema.get('type')
+    if type_ in JSON_TYPES:
+        expected = JSON_TYPES[type_]
+        is_numeric = type_ in ('integer', 'number')
+
+        def check_type(value, pointer, errors):
+            if not isinstance(value, expected) or \
+                    (is_numeric and isinstance(value, bool)):
+                errors[pointer] = "Not {} type".format(type_)
+                return False
+            return True
+        checks.append(check_type)
+
+    constraints = compile_checks(schema)
+    if constraints:
+        def check_constraints(value, pointer, errors):
+            try:
+                for check in constraints:
+                    check(value)
+            except (ValueError, TypeError) as e:
+                errors[pointer] = str(e)
+                return False
+            return True
+        checks.append(check_constraints)
+
+    required = tuple(schema.get('required') or ())
+    properties = tuple(
+        (name, '/' + name.replace('~', '~0').replace('/', '~1'),
+         _compile_node(property))
+        for name, property in (schema.get('properties') or {}).items()
+    )
+    if required or properties:
+        def check_object(value, pointer, errors):
+            if not isinstance(value, dict):
+                return True
+            for name in required:
+                if name not in value:
+                    errors[pointer + '/' + name] = "Missing required field"
+            for name, suffix, check in properties:
+                if name in value:
+                    check(value[name], pointer + suffix, errors)
+            return True
+        checks.append(check_object)
+
+    items = schema.get('items')
+    if isinstance(items, dict):
+        check_item = _compile_node(items)
+
+        def check_items(value, pointer, errors):
+            if isinstance(value, list):
+                for i, item in enumerate(value):
+                    check_item(item, '{}/{}'.format(pointer, i), errors)
+            return True
+        checks.append(check_items)
+
+    for sub_schema in schema.get('allOf') or ():
+        checks.append(_compile_node(sub_schema))
+
+    checks = tuple(checks)
+
+    def check(value, pointer, errors):
+        for check in checks:
+            if check(value, pointer, errors) is False:
+                return False
+        return True
+
+    def validate(value):
+        errors = {}
+        check(value, '', errors)
+        if errors:
+            raise ValidationError(errors)
+        return value
+    validate.check = check
+    return validate
+
+
+def _compile_node(schema: dict):
+    return compile_schema(schema).check
+
+
+def compile_response_validators(responses: dict) -> dict:
+    """
+    Compile validators for bodies of dumped responses object.
+
+    :returns: map of status code (as string, or ``'default'``) to validator
+              compiled by :func:`compile_schema`. Responses without schema
+              are omitted.
+
+    """
+    validators = {}
+    for status, response in (responses or {}).items():
+        schema = response.get('schema')
+        if schema:
+            validators[str(status)] = compile_schema(schema)
+    return validators
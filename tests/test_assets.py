@@ -0,0 +1,107 @@
+"""
+tests.test_assets
+=================
+
+Tests for Swagger-UI asset store.
+
+"""
+import gzip
+import os
+import re
+import zipfile
+
+from flask import Flask
+from flask_swag import Swag
+from flask_swag.assets import AssetStore, fingerprint_name, minified_name
+from flask_swag.globals import SWAGGER_UI_DIR
+
+
+def test_names():
+    assert 'lib/a.0123.js' == fingerprint_name('lib/a.js', '0123')
+    assert 'lib/a.min.js' == minified_name('lib/a.js')
+    assert 'lib/a.min.js' == minified_name('lib/a.min.js')
+
+
+def test_store():
+    store = AssetStore(SWAGGER_UI_DIR)
+
+    asset = store.assets['swagger-ui.min.js']
+    assert asset is store.fingerprinted[asset.fingerprinted]
+    # Variants are built on first use
+    assert not asset.variants._variants
+    assert 'gzip' in asset.variants
+    assert {'gzip'} == set(asset.variants._variants)
+    assert asset.variants['gzip'] is asset.variants['gzip']
+    # Images are not compressed
+    assert 'gzip' not in store.assets['images/throbber.gif'].variants
+
+    # References are rewritten to fingerprinted minified files
+    html = store.rewrite_html(
+        "<script src='swagger-ui.js'></script>"
+        '<link href="css/screen.css"/>'
+        '<a href="http://swagger.io">')
+    assert asset.fingerprinted in html
+    assert store.assets['css/screen.css'].fingerprinted in html
+    assert 'http://swagger.io' in html
+
+
+def test_serve_assets():
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    Swag(app)
+
+    client = app.test_client()
+    html = client.get('/swagger/ui/').data.decode('utf-8')
+    path, = re.findall(r"src='(swagger-ui\.min\.\w+\.js)'", html)
+
+    response = client.get('/swagger/ui/' + path,
+                          headers={'Accept-Encoding': 'gzip'})
+    assert 200 == response.status_code
+    assert 'gzip' == response.content_encoding
+    assert 'immutable' in response.headers['Cache-Control']
+    assert 'max-age=31536000' in response.headers['Cache-Control']
+    with open(SWAGGER_UI_DIR + '/swagger-ui.min.js', 'rb') as f:
+        assert f.read() == gzip.decompress(response.data)
+
+    # Identity
+    response = client.get('/swagger/ui/' + path)
+    assert response.content_encoding is None
+    assert 'immutable' in response.headers['Cache-Control']
+
+    # Conditional request
+    etag, _ = response.get_etag()
+    response = client.get('/swagger/ui/' + path,
+                          headers={'If-None-Match': '"{}"'.format(etag)})
+    assert 304 == response.status_code
+
+    # Plain paths are still served
+    response = client.get('/swagger/ui/swagger-ui.js')
+    assert 200 == response.status_code
+    assert 'immutable' not in response.headers['Cache-Control']
+
+    assert 404 == client.get('/swagger/ui/missing.js').status_code
+
+
+def test_archive(tmpdir):
+    filename = str(tmpdir.join('swagger-ui.zip'))
+    with zipfile.ZipFile(filename, 'w') as archive:
+        for name in ['index.html', 'swagger-ui.js', 'css/screen.css']:
+            archive.write(os.path.join(SWAGGER_UI_DIR, name),
+                          'swagger-ui-2.1/' + name)
+
+    store = AssetStore(filename)
+    assert {'index.html', 'swagger-ui.js', 'css/screen.css'} == \
+        set(store.assets)
+
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    app.config['SWAG_UI_ROOT'] = filename
+    Swag(app)
+
+    client = app.test_client()
+    response = client.get('/swagger/ui/')
+    assert 200 == response.status_code
+    assert b"url: '/swagger/swagger.json'" in response.data
+    assert 200 == client.get('/swagger/ui/css/screen.css').status_code
@@ -0,0 +1,126 @@
+"""
+tests.test_basespec
+===================
+
+Tests for base spec merged with generated spec.
+
+"""
+import json
+import os
+
+import pytest
+from flask import Flask
+from flask_swag import Swag
+from flask_swag.basespec import BaseSpec
+from flask_swag.files import FileCache
+from flask_swag.utils import merge_shared
+
+
+def test_merge_shared():
+    dest = {
+        'definitions': {'User': {'type': 'object'}},
+        'paths': {'/users/': {'get': {'summary': "List users."}}},
+        'schemes': ['http', 'https'],
+    }
+    src = {
+        'paths': {
+            '/users/': {'post': {'summary': "Create user."}},
+            '/posts/': {'get': {'summary': "List posts."}},
+        },
+        'schemes': ['https'],
+    }
+    merged = merge_shared(dest, src)
+    assert {
+        'definitions': {'User': {'type': 'object'}},
+        'paths': {
+            '/users/': {
+                'get': {'summary': "List users."},
+                'post': {'summary': "Create user."},
+            },
+            '/posts/': {'get': {'summary': "List posts."}},
+        },
+        'schemes': ['https'],
+    } == merged
+    # Values only in one side are shared, not copied
+    assert merged['definitions'] is dest['definitions']
+    assert merged['paths']['/posts/'] is src['paths']['/posts/']
+    assert merged['paths']['/users/']['get'] is dest['paths']['/users/']['get']
+    # Nothing is mutated
+    assert ['get'] == list(dest['paths']['/users/'])
+
+
+def test_merge_shared_none():
+    dest = {
+        'info': {'title': "Base", 'description': "Base API."},
+        'definitions': {'User': {'type': 'object'}},
+    }
+    src = {
+        'info': {'title': "Generated", 'description': None},
+        'definitions': None,
+        'host': None,
+    }
+    merged = merge_shared(dest, src)
+    # None of generated spec does not replace the base
+    assert {'title': "Generated", 'description': "Base API."} \
+        == merged['info']
+    assert merged['definitions'] is dest['definitions']
+    assert merged['host'] is None
+
+
+def test_base_spec(tmpdir):
+    path = tmpdir.join('base.json')
+    path.write('{"definitions": {"User": {"type": "object"}}}')
+    base_spec = BaseSpec(str(path), FileCache())
+    first = base_spec.merge({'swagger': '2.0'})
+    second = base_spec.merge({'swagger': '2.0'})
+    assert {'swagger': '2.0', 'definitions': {'User': {'type': 'object'}}} \
+        == first
+    # Parsed once
+    assert first['definitions'] is second['definitions']
+    # Base is frozen, so mutating merged spec does not leak into later ones
+    with pytest.raises(TypeError):
+        first['definitions']['Post'] = {'type': 'object'}
+    assert ['User'] == list(base_spec.merge({})['definitions'])
+
+    version = base_spec.version()
+    path.write('{"definitions": {}}')
+    os.utime(str(path), ns=(0, 0))
+    # Checked at most once per interval
+    assert version == base_spec.version(interval=60)
+    assert version != base_spec.version()
+    assert {} == base_spec.merge({'swagger': '2.0'})['definitions']
+
+
+def test_serve_base_spec(tmpdir):
+    path = tmpdir.join('base.json')
+    path.write(json.dumps({
+        'securityDefinitions': {'token': {'type': 'apiKey', 'in': 'header',
+                                          'name': 'Authorization'}},
+        'paths': {'/users/': {'get': {'security': [{'token': []}]}}},
+    }))
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    app.config['SWAG_BASE_SPEC'] = str(path)
+    app.config['SWAG_FILE_CHECK_INTERVAL'] = 0
+    swag = Swag(app)
+
+    @app.route('/users/')
+    def user_index():
+        """List users."""
+
+    with app.test_client() as client:
+        spec = json.loads(client.get('/swagger/swagger.json').data
+                          .decode('utf-8'))
+        assert 'token' in spec['securityDefinitions']
+        operation = spec['paths']['/users/']['get']
+        assert [{'token': []}] == operation['security']
+        assert "List users." == operation['summary']
+
+        # Modified base spec is served without new routes
+        path.write('{"securityDefinitions": {}}')
+        os.utime(str(path), ns=(0, 0))
+        spec = json.loads(client.get('/swagger/swagger.json').data
+                          .decode('utf-8'))
+        assert {} == spec['securityDefinitions']
+    assert (0, len(path.read())) == swag.get_spec_version(app)[-1]
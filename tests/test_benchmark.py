@@ -0,0 +1,155 @@
+"""
+tests.test_benchmark
+====================
+
+Performance budgets.
+
+Wall-clock budgets depend on the machine, so they are checked only with
+``SWAG_BENCHMARK=1``. Other checks always run.
+
+"""
+import json
+import os
+import subprocess
+import sys
+import timeit
+
+import pytest
+
+#: Mark of tests that measure wall-clock time
+benchmark = pytest.mark.skipif(not os.environ.get('SWAG_BENCHMARK'),
+                               reason="SWAG_BENCHMARK is not set")
+
+
+def run_python(code):
+    output = subprocess.check_output([sys.executable, '-c', code])
+    return json.loads(output.decode('utf-8'))
+
+
+def test_import_modules():
+    """Importing Flask-Swag should not load marshmallow."""
+    result = run_python('''
+import json, sys
+import flask_swag
+print(json.dumps([name for name in sys.modules
+                  if name.startswith('marshmallow') or
+                  name == 'flask_swag.schemas']))
+''')
+    assert [] == result
+
+
+@benchmark
+def test_import_time():
+    """Importing Flask-Swag should be cheap."""
+    result = run_python('''
+import json, time
+import flask
+started = time.perf_counter()
+import flask_swag
+elapsed = time.perf_counter() - started
+print(json.dumps({'elapsed': elapsed}))
+''')
+    assert result['elapsed'] < 0.2
+
+
+def test_lazy_schemas():
+    """Schemas are built on first use of factories."""
+    result = run_python('''
+import json, sys
+from flask_swag import core
+core.Parameter(name='page', in_='query', type='integer')
+print(json.dumps(sorted(core._schemas)))
+''')
+    assert ['ParameterSchema'] == result
+
+
+@benchmark
+def test_compiled_validator():
+    """Compiled validators are much faster than generic JSON schema."""
+    jsonschema = pytest.importorskip('jsonschema')
+    from flask import Flask, request
+    from flask_swag.validation import COERCERS, compile_validator
+
+    parameters = [
+        {'name': 'p{}'.format(i), 'in': 'query', 'type': type_,
+         'required': True}
+        for i, type_ in enumerate(['integer', 'string', 'number'] * 3)
+    ]
+    parameters[0].update(minimum=0, maximum=100)
+    parameters[1].update(enum=['a', 'b'])
+    schema = {
+        'type': 'object',
+        'required': [p['name'] for p in parameters],
+        'properties': {
+            p['name']: {key: value for key, value in p.items()
+                        if key not in ('name', 'in', 'required')}
+            for p in parameters
+        },
+    }
+    generic = jsonschema.Draft4Validator(schema)
+    compiled = compile_validator(parameters)
+
+    def validate_generic(request):
+        values = {
+            p['name']: COERCERS[p['type']](request.args[p['name']])
+            for p in parameters
+        }
+        generic.validate(values)
+        return values
+
+    app = Flask(__name__)
+    query_string = '&'.join('p{}={}'.format(i, value) for i, value in
+                            enumerate(['1', 'a', '1.5'] * 3))
+    with app.test_request_context('/?' + query_string):
+        request = request._get_current_object()
+        assert validate_generic(request) == compiled(request)
+        generic_time = min(timeit.repeat(lambda: validate_generic(request),
+                                         number=200, repeat=3))
+        compiled_time = min(timeit.repeat(lambda: compiled(request),
+                                          number=200, repeat=3))
+    assert compiled_time * 3 < generic_time
+
+
+def test_unsampled_response(monkeypatch):
+    """Responses not sampled for validation are not validated."""
+    import flask_swag
+    from flask import Flask, Response
+    from flask_swag import Swag
+
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    app.config['SWAG_RESPONSE_VALIDATION_RATE'] = 0.5
+    swag = Swag(app)
+    hook, = app.after_request_funcs[None]
+    validated = []
+    monkeypatch.setattr(swag, 'validate_response', validated.append)
+
+    response = Response('{}', mimetype='application/json')
+    monkeypatch.setattr(flask_swag, '_random', lambda: 0.9)
+    assert response is hook(response)
+    assert [] == validated
+    monkeypatch.setattr(flask_swag, '_random', lambda: 0.1)
+    hook(response)
+    assert [response] == validated
+
+
+@benchmark
+def test_unsampled_response_overhead():
+    """Responses not sampled for validation should cost almost nothing."""
+    from flask import Flask, Response
+    from flask_swag import Swag
+
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    app.config['SWAG_RESPONSE_VALIDATION_RATE'] = 1e-9
+    Swag(app)
+    hook, = app.after_request_funcs[None]
+
+    response = Response('{}', mimetype='application/json')
+    number = 10000
+    elapsed = min(timeit.repeat(lambda: hook(response), number=number,
+                                repeat=3))
+    # Less than 2 microseconds per request
+    assert elapsed / number < 2e-6
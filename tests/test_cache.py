@@ -0,0 +1,238 @@
+"""
+tests.test_cache
+================
+
+Tests for caches shared between workers.
+
+"""
+import json
+import os
+import subprocess
+import sys
+
+from flask import Flask
+from flask_swag import Swag
+from flask_swag.cache import SharedFileCache
+from flask_swag.extractor import MarkExtractor
+from flask_swag.fingerprint import class_digest, code_digest
+
+
+def test_shared_file_cache(tmpdir):
+    cache = SharedFileCache(str(tmpdir.join('spec')))
+    calls = []
+
+    def generate():
+        calls.append(None)
+        return b'{"paths":{}}'
+
+    assert b'{"paths":{}}' == cache.get('key', generate)[:]
+    assert b'{"paths":{}}' == cache.get('key', generate)[:]
+    assert 1 == len(calls)
+    # No temporary files are left
+    assert ['key.json', 'key.json.lock'] == sorted(
+        os.listdir(cache.directory))
+
+
+def test_shared_file_cache_eviction(tmpdir):
+    cache = SharedFileCache(str(tmpdir.join('spec')), keep=2)
+    for i, key in enumerate(['a', 'b', 'c']):
+        cache.get(key, lambda: b'{}')
+        os.utime(cache.path_of(key), ns=(i, i))
+    # Only current and the most recent previous files are kept
+    assert ['b.json', 'b.json.lock', 'c.json', 'c.json.lock'] == sorted(
+        os.listdir(cache.directory))
+    mapped = cache.load('b')
+    cache.get('d', lambda: b'{}')
+    assert ['c.json', 'c.json.lock', 'd.json', 'd.json.lock'] == sorted(
+        os.listdir(cache.directory))
+    # Evicted files stay readable for processes that mapped them
+    assert b'{}' == mapped[:]
+
+
+def make_app(cache_dir, history_size=0):
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    app.config['SWAG_CACHE_DIR'] = cache_dir
+    app.config['SWAG_HISTORY_SIZE'] = history_size
+    swag = Swag(app)
+
+    @app.route('/users/')
+    @swag.mark.query('page', int)
+    def user_index():
+        """List users."""
+
+    return app, swag
+
+
+def test_shared_spec(tmpdir):
+    cache_dir = str(tmpdir)
+    app, swag = make_app(cache_dir)
+    client = app.test_client()
+    response = client.get('/swagger/swagger.json')
+    assert 200 == response.status_code
+    spec = json.loads(response.data.decode('utf-8'))
+    assert '/users/' in spec['paths']
+    files = [name for name in os.listdir(cache_dir)
+             if name.endswith('.json')]
+    assert 1 == len(files)
+
+    # Another worker serves the stored file without generating
+    other, _ = make_app(cache_dir)
+    other.generate_swagger = None
+    other_response = other.test_client().get('/swagger/swagger.json')
+    assert response.data == other_response.data
+    assert response.headers['ETag'] == other_response.headers['ETag']
+    assert str(len(response.data)) == other_response.headers[
+        'Content-Length']
+
+    # Changed marks make a new file, old ones are evicted
+    app.swag_shared_cache.keep = 1
+
+    @app.route('/posts/')
+    def post_index():
+        pass
+    client.get('/swagger/swagger.json')
+    files = [name for name in os.listdir(cache_dir)
+             if name.endswith('.json')]
+    assert 1 == len(files)
+    assert b'/posts/' in app.swag_shared_cache.load(files[0][:-5])[:]
+
+
+def test_shared_spec_hashes(tmpdir):
+    cache_dir = str(tmpdir)
+    app, swag = make_app(cache_dir)
+    app.test_client().get('/swagger/swagger.json')
+    # Nothing is hashed without deltas
+    assert not [name for name in os.listdir(cache_dir)
+                if name.endswith('.hashes')]
+
+    cache_dir = str(tmpdir.mkdir('history'))
+    app, swag = make_app(cache_dir, history_size=4)
+    with app.test_request_context('/swagger/swagger.json'):
+        hashes = swag.build_encoded_swagger(app).hashes
+    assert '/paths/~1users~1' in hashes
+
+    # Another worker loads stored hashes instead of decoding spec
+    other, other_swag = make_app(cache_dir, history_size=4)
+
+    def decode_encoded(encoded):
+        raise AssertionError("Decoded")
+    other_swag.decode_encoded = decode_encoded
+    with other.test_request_context('/swagger/swagger.json'):
+        assert hashes == other_swag.build_encoded_swagger(other).hashes
+
+
+def test_fingerprint_across_processes(tmpdir):
+    """Fingerprints of identical apps are same regardless of hash seed."""
+    code = '''
+import sys
+from flask import Flask
+from flask_swag import Swag
+app = Flask(__name__)
+app.config.update(SWAG_TITLE='Test', SWAG_API_VERSION='1')
+swag = Swag(app)
+
+@app.route('/b/', methods=['GET', 'POST', 'PUT'])
+@swag.mark.query('x', int)
+@swag.mark.response(201, 'Created')
+def b():
+    pass
+
+sys.stdout.write(app.swagger_fingerprint())
+'''
+    fingerprints = set()
+    for seed in ['1', '2', '3']:
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        fingerprints.add(subprocess.check_output(
+            [sys.executable, '-c', code], env=env))
+    assert 1 == len(fingerprints)
+
+
+def make_snapshot_app(snapshot_dir):
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    app.config['SWAG_SNAPSHOT_DIR'] = snapshot_dir
+    swag = Swag(app)
+
+    @app.route('/users/<int:user_id>')
+    @swag.mark.response(404, "Not found")
+    def user_read(user_id):
+        """Read user."""
+
+    return app
+
+
+def test_snapshot(tmpdir):
+    snapshot_dir = str(tmpdir)
+    app = make_snapshot_app(snapshot_dir)
+    response = app.test_client().get('/swagger/swagger.json')
+    spec = json.loads(response.data.decode('utf-8'))
+    assert 'localhost' == spec['host']
+    assert 1 == len([name for name in os.listdir(snapshot_dir)
+                     if name.endswith('.json')])
+
+    # Fresh process loads snapshot without extraction
+    fresh = make_snapshot_app(snapshot_dir)
+
+    def generate_swagger():
+        raise AssertionError("Spec must be loaded from snapshot")
+    fresh.generate_swagger = generate_swagger
+    response = fresh.test_client().get('/swagger/swagger.json',
+                                       base_url='https://example.com')
+    loaded = json.loads(response.data.decode('utf-8'))
+    assert 'example.com' == loaded['host']
+    assert ['https'] == loaded['schemes']
+    assert spec['paths'] == loaded['paths']
+
+
+def test_code_digest():
+    def view():
+        return 'a'
+
+    def changed():
+        return 'b'
+
+    assert code_digest(view) == code_digest(view)
+    assert code_digest(view) != code_digest(changed)
+
+
+def test_signature_digest():
+    def view(user_id: int, page=1):
+        pass
+
+    def retyped(user_id: str, page=1):
+        pass
+
+    def redefaulted(user_id: int, page=2):
+        pass
+
+    retyped.__code__ = redefaulted.__code__ = view.__code__
+    assert code_digest(view) != code_digest(retyped)
+    assert code_digest(view) != code_digest(redefaulted)
+
+
+def test_extractor_digest():
+    class Extractor(MarkExtractor):
+        def extract_summary(self, view, ctx):
+            return 'a'
+    digest = class_digest(Extractor)
+    assert digest == class_digest(Extractor)
+    assert digest != class_digest(MarkExtractor)
+
+    class Changed(MarkExtractor):
+        def extract_summary(self, view, ctx):
+            return 'b'
+    Changed.__name__ = Changed.__qualname__ = Extractor.__qualname__
+    assert digest != class_digest(Changed)
+
+    # Changed extractor changes fingerprint of app
+    def make(extractor=None):
+        app = Flask(__name__)
+        app.config['SWAG_TITLE'] = "Test application."
+        app.config['SWAG_API_VERSION'] = '1.0.1'
+        return app, Swag(app, extractor=extractor)
+    app, swag = make()
+    other, other_swag = make(Extractor())
+    assert swag.fingerprint(app) != other_swag.fingerprint(other)
@@ -1,7 +1,8 @@
 import pytest
 
 from flask_swag.core import parameters_from_object_schema, dump, Swagger, \
-    Info, PathItem, Operation, Response, Schema, License
+    Info, PathItem, Operation, Response, Schema, License, Parameter, \
+    share_parameters
 
 
 def test_factory():
@@ -159,3 +160,31 @@ def test_strict():
         foo='bar',
         _strict=False
     )
+
+
+def test_shared_parameter():
+    # Factory always returns a new plain dict
+    parameter = Parameter(name='user_id', in_='path', type='integer',
+                          required=True)
+    assert type(parameter) is dict
+    assert parameter is not Parameter(name='user_id', in_='path',
+                                      type='integer', required=True)
+    parameter['description'] = "ID of user."
+
+    # Identical dumped parameters are the same immutable instance
+    def make_operation(required=True):
+        return {'parameters': [
+            {'name': 'user_id', 'in': 'path', 'type': 'integer',
+             'required': required},
+            {'name': 'kind', 'in': 'query', 'type': 'string',
+             'enum': ['a', 'b']},
+        ]}
+    first, kind = share_parameters(make_operation())['parameters']
+    second, _ = share_parameters(make_operation())['parameters']
+    assert first is second
+    assert first is not share_parameters(make_operation(1))['parameters'][0]
+    with pytest.raises(TypeError):
+        first['required'] = False
+
+    # Parameters with unhashable values are not shared
+    kind['enum'].append('c')
@@ -0,0 +1,112 @@
+"""
+tests.test_delta
+================
+
+Tests for changes between spec versions.
+
+"""
+import json
+
+import pytest
+from flask import Flask
+from flask_swag import Swag
+from flask_swag.delta import SpecHistory, resolve_pointer, spec_hashes
+
+
+def test_spec_history():
+    old = {
+        'info': {'title': 'Foo'},
+        'paths': {'/a/': {'get': {}}, '/b/': {'get': {}}},
+    }
+    new = {
+        'info': {'title': 'Foo'},
+        'paths': {'/a/': {'post': {}}, '/c/{id}': {'get': {}}},
+        'host': 'localhost',
+    }
+    history = SpecHistory(size=2)
+    history.record('old', lambda: spec_hashes(old))
+    history.record('new', lambda: spec_hashes(new))
+    assert [
+        {'op': 'remove', 'path': '/paths/~1b~1'},
+        {'op': 'add', 'path': '/host', 'value': 'localhost'},
+        {'op': 'add', 'path': '/paths/~1c~1{id}', 'value': {'get': {}}},
+        {'op': 'replace', 'path': '/paths/~1a~1', 'value': {'post': {}}},
+    ] == history.make_patch('old', 'new', new)
+    assert {
+        'changed': ['/c/{id}', '/a/'],
+        'removed': ['/b/'],
+        'fields': ['host'],
+    } == history.make_changes('old', 'new')
+
+    history.record('newer', lambda: spec_hashes(new))
+    # Too old
+    assert history.make_patch('old', 'newer', new) is None
+    assert [] == history.make_patch('new', 'newer', new)
+
+
+def test_resolve_pointer():
+    swagger = {
+        'paths': {'/a/{id}': {'get': {'responses': {200: {}}}}},
+        'schemes': ['http', 'https'],
+    }
+    assert {} == resolve_pointer(swagger,
+                                 '/paths/~1a~1{id}/get/responses/200')
+    assert 'https' == resolve_pointer(swagger, '/schemes/1')
+    with pytest.raises(KeyError):
+        resolve_pointer(swagger, '/paths/~1b~1')
+    with pytest.raises(KeyError):
+        resolve_pointer(swagger, '/schemes/2')
+
+
+def apply_patch(document, patch):
+    for operation in patch:
+        parent = document
+        *tokens, last = [token.replace('~1', '/').replace('~0', '~')
+                         for token in operation['path'].split('/')[1:]]
+        for token in tokens:
+            parent = parent[token]
+        if operation['op'] == 'remove':
+            del parent[last]
+        else:
+            parent[last] = operation['value']
+    return document
+
+
+def test_delta_endpoint():
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    app.config['SWAG_HISTORY_SIZE'] = 16
+    swag = Swag(app)
+    client = app.test_client()
+
+    @app.route('/users/')
+    def user_index():
+        pass
+
+    response = client.get('/swagger/swagger.json')
+    etag, _ = response.get_etag()
+    old = json.loads(response.data.decode('utf-8'))
+
+    @app.route('/users/<int:user_id>')
+    @swag.mark.summary("Read user")
+    def user_read(user_id):
+        pass
+
+    response = client.get('/swagger/swagger.json?since=' + etag)
+    assert 'application/json-patch+json' == response.mimetype
+    patch = json.loads(response.data.decode('utf-8'))
+    assert ['add'] == [operation['op'] for operation in patch]
+    full = client.get('/swagger/swagger.json')
+    assert full.get_etag() == response.get_etag()
+    assert json.loads(full.data.decode('utf-8')) == apply_patch(old, patch)
+
+    response = client.get(
+        '/swagger/swagger.json?delta=paths&since="{}"'.format(etag))
+    assert {
+        'changed': ['/users/{user_id}'], 'removed': [], 'fields': [],
+    } == json.loads(response.data.decode('utf-8'))
+
+    # Unknown version gets full document
+    response = client.get('/swagger/swagger.json?since=unknown')
+    assert full.data == response.data
@@ -0,0 +1,277 @@
+"""
+tests.test_encoding
+===================
+
+Tests for encoding spec.
+
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from flask import Flask
+
+from flask_swag import Swag
+from flask_swag.core import RawJSON
+from flask_swag.encoding import ENCODERS, canonicalize, compact_dumps, \
+    dumps_json, encode_json, get_dumps, minify, resolve_encoders
+
+
+def test_minify():
+    assert {
+        'paths': {},
+        'info': {'title': 'Foo'},
+        'definitions': {
+            'Foo': {'default': [], 'example': {'bar': None}},
+            'Bar': {'properties': {'any': {}}},
+            'Baz': {},
+        },
+    } == minify({
+        'paths': {},
+        'schemes': [],
+        'security': [],
+        'tags': [],
+        'info': {'title': 'Foo', 'description': None},
+        'definitions': {
+            'Foo': {'default': [], 'example': {'bar': None}},
+            'Bar': {'properties': {'any': {}}, 'required': []},
+            'Baz': {},
+        },
+    })
+
+
+def test_minify_operation():
+    operation = {
+        'summary': None,
+        'parameters': [],
+        # Overrides security of root object
+        'security': [],
+        'produces': [],
+        'responses': {
+            'default': {'description': '', 'schema': {}, 'headers': {}},
+            '200': {'description': 'OK', 'schema': {
+                'type': 'array', 'items': {}, 'default': [None]}},
+        },
+    }
+    assert {
+        'security': [],
+        'produces': [],
+        'responses': {
+            'default': {'description': '', 'schema': {}},
+            '200': {'description': 'OK', 'schema': {
+                'type': 'array', 'items': {}, 'default': [None]}},
+        },
+    } == minify({'paths': {'/': {'get': operation}}})['paths']['/']['get']
+
+
+def test_get_dumps():
+    assert compact_dumps is get_dumps()
+    assert compact_dumps is get_dumps('no_such_json_module')
+    assert json.dumps is get_dumps(json.dumps)
+
+    encoded = encode_json({'a': [1, 2]})
+    assert b'{"a":[1,2]}' == encoded.data
+
+
+def test_orjson():
+    pytest.importorskip('orjson')
+    dumps = get_dumps('orjson')
+    assert b'{"201":{"description":"Created"}}' == \
+        dumps({201: {'description': 'Created'}})
+
+
+def test_serve_encoded():
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    app.config['SWAG_JSON_MINIFY'] = True
+    app.config['SWAG_JSON_ENCODER'] = 'orjson'
+    Swag(app)
+
+    @app.route('/users/')
+    def user_index():
+        pass
+
+    client = app.test_client()
+    response = client.get('/swagger/swagger.json')
+    assert 200 == response.status_code
+    assert b'": ' not in response.data
+    operation = json.loads(response.data.decode('utf-8'))['paths'][
+        '/users/']['get']
+    # `description` and `summary` were null, `parameters` was empty
+    assert {'responses': {'default': {'description': ''}}} == operation
+
+    etag, _ = response.get_etag()
+    response = client.get('/swagger/swagger.json',
+                          headers={'If-None-Match': '"{}"'.format(etag)})
+    assert 304 == response.status_code
+
+
+def test_canonicalize():
+    spec = {
+        'paths': {
+            '/users/': {
+                'post': {
+                    'parameters': [
+                        {'in': 'query', 'name': 'b'},
+                        {'in': 'formData', 'name': 'z'},
+                        {'in': 'query', 'name': 'a'},
+                    ],
+                    'responses': {
+                        'default': {'description': ''},
+                        201: {'description': 'Created'},
+                    },
+                },
+                'get': {},
+            },
+            '/': {},
+        },
+        'info': {},
+    }
+    canonical = canonicalize(spec)
+    assert ['info', 'paths'] == list(canonical)
+    assert ['/', '/users/'] == list(canonical['paths'])
+    operations = canonical['paths']['/users/']
+    assert ['get', 'post'] == list(operations)
+    assert [('formData', 'z'), ('query', 'a'), ('query', 'b')] == [
+        (p['in'], p['name']) for p in operations['post']['parameters']]
+    assert ['201', 'default'] == list(operations['post']['responses'])
+
+
+@pytest.mark.parametrize('canonical', [False, True])
+def test_canonical_example(canonical):
+    """Data fields that look like spec fields are served as is."""
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    app.config['SWAG_CANONICAL'] = canonical
+    swag = Swag(app)
+    example = {'parameters': [3, 1, 2], 'required': ['b', 'a']}
+
+    @app.route('/users/')
+    @swag.mark.response(200, 'ok', {'type': 'object', 'example': example})
+    def user_index():
+        pass
+
+    response = app.test_client().get('/swagger/swagger.json')
+    assert 200 == response.status_code
+    spec = json.loads(response.data.decode('utf-8'))
+    schema = spec['paths']['/users/']['get']['responses']['200']['schema']
+    assert example == schema['example']
+
+
+def test_byte_stable_across_processes():
+    """Identical apps produce identical bytes regardless of hash seed."""
+    code = '''
+import sys
+from flask import Flask
+from flask_swag import Swag
+app = Flask(__name__)
+app.config.update(SWAG_TITLE='Test', SWAG_API_VERSION='1',
+                  SWAG_CANONICAL=True)
+swag = Swag(app)
+
+@app.route('/b/', methods=['GET', 'POST', 'PUT', 'DELETE', 'PATCH'])
+@swag.mark.query('x', int)
+@swag.mark.query('y', int)
+@swag.mark.response(201, 'Created')
+def b():
+    pass
+
+@app.route('/a/')
+def a():
+    pass
+
+sys.stdout.write(app.test_client().get('/swagger/swagger.json').headers[
+    'ETag'])
+'''
+    etags = set()
+    for seed in ['1', '2', '3']:
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        etags.add(subprocess.check_output([sys.executable, '-c', code],
+                                          env=env))
+    assert 1 == len(etags)
+
+
+def test_negotiate_format():
+    yaml = pytest.importorskip('yaml')
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    swag = Swag(app)
+
+    @swag.spec_encoder('application/x-test')
+    def dumps(swagger):
+        return 'test:' + swagger['info']['title']
+
+    @app.route('/users/')
+    def user_index():
+        pass
+
+    client = app.test_client()
+    response = client.get('/swagger/swagger.json')
+    assert 'application/json' == response.mimetype
+    assert 'Accept' in response.headers['Vary']
+    spec = json.loads(response.data.decode('utf-8'))
+
+    response = client.get('/swagger/swagger.json',
+                          headers={'Accept': 'application/yaml'})
+    assert 'application/yaml' == response.mimetype
+    assert spec == yaml.safe_load(response.data)
+    etag = response.headers['ETag']
+    again = client.get('/swagger/swagger.json',
+                       headers={'Accept': 'application/yaml'})
+    assert etag == again.headers['ETag']
+
+    response = client.get('/swagger/swagger.json',
+                          headers={'Accept': 'application/x-test'})
+    assert b'test:Test application.' == response.data
+
+    # Not installed
+    response = client.get('/swagger/swagger.json',
+                          headers={'Accept': 'application/x-unknown'})
+    assert 'application/json' == response.mimetype
+
+
+def test_msgpack():
+    msgpack = pytest.importorskip('msgpack')
+    dumps = resolve_encoders(ENCODERS)['application/msgpack']
+    assert {201: {'description': 'Created'}} == msgpack.unpackb(
+        dumps({201: {'description': 'Created'}}), raw=False,
+        strict_map_key=False)
+
+
+def test_raw_json():
+    fragment = RawJSON('{"users": [{"name": "a b"}]}')
+    data = dumps_json({'example': fragment, 'items': [fragment, 1]})
+    assert {
+        'example': {'users': [{'name': 'a b'}]},
+        'items': [{'users': [{'name': 'a b'}]}, 1],
+    } == json.loads(data.decode('utf-8'))
+    # Spliced verbatim
+    assert 2 == data.count(b'{"users": [{"name": "a b"}]}')
+
+
+def test_serve_raw_json():
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    swag = Swag(app)
+    example = RawJSON(json.dumps([{'id': i} for i in range(3)]))
+
+    @app.route('/users/')
+    @swag.mark.response(200, "Users", {'type': 'array', 'example': example})
+    def user_index():
+        pass
+
+    with app.test_request_context('/swagger/swagger.json'):
+        swagger = app.generate_swagger()
+    schema = swagger['paths']['/users/']['get']['responses'][200]['schema']
+    assert example is schema['example']
+
+    response = app.test_client().get('/swagger/swagger.json')
+    spec = json.loads(response.data.decode('utf-8'))
+    assert [{'id': 0}, {'id': 1}, {'id': 2}] == spec['paths']['/users/'][
+        'get']['responses']['200']['schema']['example']
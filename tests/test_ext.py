@@ -0,0 +1,81 @@
+"""
+tests.test_ext
+==============
+
+Tests for external schema conversion.
+
+"""
+import pytest
+from marshmallow import Schema, fields
+
+from flask_swag.ext import ConversionCache, marshmallow_key
+
+
+class UserSchema(Schema):
+    name = fields.String(required=True)
+    email = fields.String()
+
+
+def test_marshmallow_key():
+    assert UserSchema is marshmallow_key(UserSchema)
+    assert UserSchema is marshmallow_key(UserSchema())
+    parametrized = UserSchema(only=('name',))
+    assert parametrized is marshmallow_key(parametrized)
+
+
+def test_marshmallow_key_customized():
+    class ExtraSchema(UserSchema):
+        def __init__(self, extra=False, **kwargs):
+            super().__init__(**kwargs)
+            if extra:
+                self.fields['extra'] = fields.Integer()
+
+    class OptionSchema(UserSchema):
+        def __init__(self, option=None, **kwargs):
+            super().__init__(**kwargs)
+            self.option = option
+
+    assert ExtraSchema is marshmallow_key(ExtraSchema())
+    customized = ExtraSchema(extra=True)
+    assert customized is marshmallow_key(customized)
+    customized = OptionSchema(option='a')
+    assert customized is marshmallow_key(customized)
+
+
+def test_conversion_cache():
+    converted = []
+
+    def convert(schema):
+        converted.append(schema)
+        names = sorted(schema.fields)
+        if isinstance(schema, Schema) and schema.only:
+            names = sorted(schema.only)
+        return {
+            'type': 'object',
+            'properties': {name: {'type': 'string'} for name in names},
+            'required': ['name'],
+        }
+
+    cache = ConversionCache(convert, marshmallow_key)
+
+    first = cache.get(UserSchema())
+    assert first is cache.get(UserSchema())
+    assert 1 == len(converted)
+
+    # Results are shared, so they are immutable
+    with pytest.raises(TypeError):
+        first.json_schema['type'] = 'array'
+    assert ('name',) == first.json_schema['required']
+
+    # Derived parameters are cached too
+    parameters = first.parameters('query')
+    assert parameters is first.parameters('query')
+    assert ['email', 'name'] == [p['name'] for p in parameters]
+    assert [False, True] == [p['required'] for p in parameters]
+    assert {'query'} == {p['in_'] for p in parameters}
+
+    # Parametrized schemas are cached per instance
+    only_name = UserSchema(only=('name',))
+    assert ['name'] == list(cache.get(only_name).json_schema['properties'])
+    assert cache.get(only_name) is cache.get(only_name)
+    assert 2 == len(converted)
@@ -6,9 +6,12 @@ Tests for extension
 
 """
 import json
+import time
 
-from flask import Flask
+from flask import Blueprint, Flask
 from flask_swag import Swag
+from flask_swag.core import LazyMapping
+from flask_swag.encoding import encode_json
 
 
 def test_extension():
@@ -26,3 +29,261 @@ def test_extension():
     response = client.get('/swagger/swagger.json')
     assert 200 == response.status_code
     assert swagger_json == json.loads(response.data.decode('utf-8'))
+
+
+def test_partial_spec():
+    """Spec can be filtered by query string."""
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+
+    swag = Swag(app)
+
+    @app.route('/users/')
+    @swag.mark({'tags': ['user'], 'operation_id': 'listUsers'})
+    def user_index():
+        pass
+
+    @app.route('/users/<int:user_id>', methods=['DELETE'])
+    @swag.mark({'tags': ['admin'], 'operation_id': 'deleteUser'})
+    def user_delete(user_id):
+        pass
+
+    @app.route('/posts/')
+    @swag.mark({'tags': ['post']})
+    def post_index():
+        pass
+
+    client = app.test_client()
+
+    def get_paths(query_string):
+        response = client.get('/swagger/swagger.json',
+                              query_string=query_string)
+        assert 200 == response.status_code
+        return json.loads(response.data.decode('utf-8'))['paths']
+
+    assert {'/users/', '/users/{user_id}'} == \
+        set(get_paths({'prefix': '/users'}))
+    assert {'/users/{user_id}': ['delete']} == {
+        path: list(item) for path, item in
+        get_paths({'prefix': '/users', 'tag': 'admin'}).items()
+    }
+    assert ['/users/'] == list(get_paths({'operationId': 'listUsers'}))
+
+    # Newly added routes invalidate the cached spec
+    @app.route('/comments/')
+    def comment_index():
+        pass
+
+    assert ['/comments/'] == list(get_paths({'prefix': '/comments'}))
+
+
+def test_lookup():
+    """Operations can be looked up by endpoint & method."""
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+
+    swag = Swag(app)
+
+    @swag.operation_metadata('deprecated')
+    def compile_deprecated(entry):
+        return bool(entry.operation.get('deprecated'))
+
+    @app.route('/users/<int:user_id>', methods=['GET', 'DELETE'])
+    @swag.mark({'deprecated': True})
+    def user(user_id):
+        entry = swag.lookup()
+        return '{} {} {}'.format(entry.path, entry.method,
+                                 entry.metadata['deprecated'])
+
+    client = app.test_client()
+    assert b'/users/{user_id} DELETE True' == client.delete('/users/1').data
+    assert b'/users/{user_id} GET True' == client.get('/users/1').data
+
+    with app.test_request_context('/'):
+        assert swag.lookup('user', 'HEAD') is swag.lookup('user', 'GET')
+        assert swag.lookup('user', 'POST') is None
+
+        # Index follows changes of URL map
+        assert swag.lookup('post_index', 'GET') is None
+
+    @app.route('/posts/')
+    def post_index():
+        pass
+
+    with app.test_request_context('/'):
+        assert '/posts/' == swag.lookup('post_index', 'GET').path
+
+
+def test_prebuild():
+    """Spec can be built before requests."""
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    app.config['SWAG_HISTORY_SIZE'] = 16
+    swag = Swag(app)
+
+    @app.route('/users/')
+    def user_index():
+        pass
+
+    encoded = swag.prebuild(app, host='api.example.com', schemes=['https'])
+    spec = json.loads(encoded.data.decode('utf-8'))
+    assert 'api.example.com' == spec['host']
+    assert ['https'] == spec['schemes']
+    assert '/users/' in spec['paths']
+
+    def generate_swagger(**kwargs):
+        raise AssertionError("Spec must be prebuilt")
+    app.generate_swagger = generate_swagger
+    client = app.test_client()
+    response = client.get('/swagger/swagger.json',
+                          base_url='https://api.example.com')
+    assert encoded.data == response.data
+    # Only encoded bytes & hashes for deltas are kept
+    assert encoded.hashes is not None
+    _, values = app.swag_cache._state
+    assert [('json', 'https://api.example.com/')] == list(values)
+
+
+def test_background_rebuild():
+    """Stale spec is served while it is rebuilt in background."""
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    app.config['SWAG_BACKGROUND_REBUILD'] = True
+    app.config['SWAG_REBUILD_DELAY'] = 0.01
+    Swag(app)
+    client = app.test_client()
+
+    def get_paths():
+        response = client.get('/swagger/swagger.json')
+        return json.loads(response.data.decode('utf-8'))['paths']
+
+    paths = get_paths()
+
+    @app.route('/users/')
+    def user_index():
+        pass
+
+    @app.route('/posts/')
+    def post_index():
+        pass
+
+    # Last spec is served without rebuilding
+    assert paths == get_paths()
+    deadline = time.time() + 5
+    while time.time() < deadline and paths == get_paths():
+        time.sleep(0.01)
+    assert {'/users/', '/posts/'} == set(get_paths()) - set(paths)
+
+
+def test_export():
+    """Operations are exported as NDJSON."""
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    swag = Swag(app)
+    blueprint = Blueprint('users', __name__)
+
+    @blueprint.route('/users/', methods=['GET', 'POST'])
+    @swag.mark.summary("Users")
+    def user_index():
+        pass
+    app.register_blueprint(blueprint)
+
+    response = app.test_client().get('/swagger/operations.ndjson')
+    assert 'application/x-ndjson' == response.mimetype
+    lines = response.data.decode('utf-8').splitlines()
+    items = [json.loads(line) for line in lines]
+    users = [item for item in items if item['path'] == '/users/']
+    assert [('get', 'users.user_index', 'users'),
+            ('post', 'users.user_index', 'users')] == [
+        (item['method'], item['endpoint'], item['blueprint'])
+        for item in users]
+    assert "Users" == users[0]['operation']['summary']
+
+    result = app.test_cli_runner().invoke(args=['swag-export'])
+    assert 0 == result.exit_code
+    assert lines == result.output.splitlines()
+
+
+def test_lazy_spec():
+    """Operations of lazy spec are extracted only when accessed."""
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    swag = Swag(app)
+
+    @app.route('/users/')
+    @swag.mark({'tags': ['user']})
+    def user_index():
+        """List users."""
+
+    @app.route('/posts/', methods=['GET', 'POST'])
+    def post_index():
+        """List posts."""
+
+    with app.test_request_context('/swagger/swagger.json'):
+        eager = app.generate_swagger()
+        lazy = app.generate_swagger(lazy=True)
+        operation = lazy['paths']['/users/']['get']
+        assert isinstance(operation, LazyMapping)
+        assert not operation.computed
+        assert eager == json.loads(encode_json(lazy).data.decode('utf-8'))
+
+        swag.get_swagger(app)
+        partial = swag.query_swagger(app, prefix='/users')
+        assert "List users." == partial['paths']['/users/']['get']['summary']
+        posts = swag.get_swagger(app)['paths']['/posts/']
+        assert not posts['get'].computed
+        assert not posts['post'].computed
+
+
+def test_shared_parameters():
+    """Identical parameters are shared in cached spec."""
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    swag = Swag(app)
+
+    @app.route('/users/<int:user_id>')
+    def user_read(user_id):
+        pass
+
+    @app.route('/users/<int:user_id>/posts/')
+    def user_posts(user_id):
+        pass
+
+    with app.test_request_context('/swagger/swagger.json'):
+        paths = swag.get_swagger(app)['paths']
+        first = paths['/users/{user_id}']['get']['parameters'][0]
+        second = paths['/users/{user_id}/posts/']['get']['parameters'][0]
+        assert first is second
+        assert 'user_id' == first['name']
+
+
+def test_path_refs():
+    """Same path items are referenced with SWAG_PATH_REFS."""
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    app.config['SWAG_PATH_REFS'] = True
+    swag = Swag(app)
+
+    @app.route('/users/')
+    @app.route('/members/')
+    @swag.mark({'tags': ['user']})
+    def user_index():
+        """List users."""
+
+    with app.test_request_context('/swagger/swagger.json'):
+        paths = swag.get_swagger(app)['paths']
+        refs = [path for path, item in paths.items() if '$ref' in item]
+        assert 1 == len(refs)
+        assert {'/users/', '/members/'} == set(
+            swag.query_swagger(app, tags=['user'])['paths'])
+        fingerprint = swag.fingerprint(app)
+        app.config['SWAG_PATH_REFS'] = False
+        assert fingerprint != swag.fingerprint(app)
@@ -191,3 +191,55 @@ def test_blueprint():
             },
         },
     } == paths
+
+
+def test_shared_operations():
+    """Operations of a view bound to multiple rules are shared."""
+    app = Flask(__name__)
+
+    @app.route('/users/')
+    @app.route('/members/')
+    def index():
+        """List users."""
+        pass
+
+    extractor = Extractor()
+    paths = extractor.extract_paths(app, exclude_endpoint=['static'])
+    assert paths['/users/']['get'] is paths['/members/']['get']
+
+    paths = extractor.extract_paths(app, exclude_endpoint=['static'],
+                                    path_refs=True)
+    first, second = sorted(paths, key=lambda path: 'ref' in paths[path])
+    assert "List users." == paths[first]['get']['summary']
+    assert {'ref': '#/paths/' + first.replace('/', '~1')} == paths[second]
+
+
+def test_shared_operations_released():
+    """Shared operations of a view are kept only until its last rule."""
+    app = Flask(__name__)
+
+    @app.route('/users/')
+    @app.route('/members/')
+    def index():
+        """List users."""
+        pass
+
+    @app.route('/items/')
+    def items():
+        """List items."""
+        pass
+
+    extractor = Extractor()
+    memos = []
+    shared_operation = extractor.shared_operation
+
+    def record(view, params, ctx, factory):
+        memos.append(ctx['operations'])
+        return shared_operation(view, params, ctx, factory)
+
+    extractor.shared_operation = record
+    for path in extractor.iter_paths(app, exclude_endpoint=['static']):
+        # Only the view bound to multiple rules is memoized
+        assert items not in memos[-1]
+    # Memo is released after the last rule of the view
+    assert {} == memos[-1]
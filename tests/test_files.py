@@ -0,0 +1,129 @@
+"""
+tests.test_files
+================
+
+Tests for JSON files referenced from marks.
+
+"""
+import json
+import os
+
+from flask import Flask
+from flask_swag import Swag
+from flask_swag.core import RawJSON
+from flask_swag.files import FileCache, FileWatcher, JSONFile, resolve_files
+
+
+def test_json_file_path():
+    reference = JSONFile('schemas/user.json')
+    assert os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'schemas', 'user.json') == reference.path
+
+
+def test_file_cache(tmpdir):
+    path = tmpdir.join('example.json')
+    path.write('{"name": "a"}')
+    cache = FileCache(size=1)
+    loaded = cache.get(str(path))
+    assert {'name': 'a'} == loaded
+    assert loaded is cache.get(str(path))
+    assert RawJSON(b'{"name": "a"}') == cache.get(str(path), raw=True)
+
+    # Changed file is loaded again
+    path.write('{"name": "bb"}')
+    os.utime(str(path), ns=(0, 0))
+    assert {'name': 'bb'} == cache.get(str(path))
+
+
+def test_resolve_files(tmpdir):
+    path = tmpdir.join('schema.json')
+    path.write('{"type": "string"}')
+    unchanged = {'type': 'object', 'required': ['a']}
+    value = {
+        'schema': JSONFile(str(path)),
+        'other': unchanged,
+    }
+    resolved = resolve_files(value)
+    assert {'type': 'string'} == resolved['schema']
+    assert unchanged is resolved['other']
+    assert unchanged is resolve_files(unchanged)
+
+
+def test_marked_files(tmpdir):
+    schema = tmpdir.join('users.json')
+    schema.write(json.dumps({'type': 'array', 'items': {'type': 'object'}}))
+    example = tmpdir.join('users.example.json')
+    example.write('[{"id": 1}]')
+
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    swag = Swag(app)
+
+    @app.route('/users/')
+    @swag.mark.response(200, "Users", JSONFile(str(schema)))
+    def user_index():
+        pass
+
+    @app.route('/admins/')
+    @swag.mark.response(200, "Admins", {
+        'type': 'array',
+        'example': JSONFile(str(example), raw=True),
+    })
+    def admin_index():
+        pass
+
+    response = app.test_client().get('/swagger/swagger.json')
+    spec = json.loads(response.data.decode('utf-8'))
+    users = spec['paths']['/users/']['get']['responses']['200']
+    assert 'array' == users['schema']['type']
+    admins = spec['paths']['/admins/']['get']['responses']['200']
+    assert [{'id': 1}] == admins['schema']['example']
+
+
+def test_json_file_base(tmpdir):
+    directory = os.path.dirname(os.path.abspath(__file__))
+    expected = os.path.join(directory, 'schemas', 'user.json')
+    assert expected == JSONFile('schemas/user.json', base=__file__).path
+    assert expected == JSONFile('schemas/user.json', base=directory).path
+    assert expected == JSONFile('schemas/user.json', base=__name__).path
+
+
+def test_file_watcher(tmpdir):
+    path = tmpdir.join('example.json')
+    path.write('{}')
+    watcher = FileWatcher()
+    cache = FileCache(watcher=watcher)
+    cache.get(str(path))
+    version = watcher.version(0)
+
+    path.write('{"a": 1}')
+    os.utime(str(path), ns=(0, 0))
+    # Checked at most once per interval
+    assert version == watcher.version(60)
+    assert version != watcher.version(0)
+
+
+def test_modified_file_invalidates_spec(tmpdir):
+    schema = tmpdir.join('users.json')
+    schema.write('{"type": "array"}')
+
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    app.config['SWAG_FILE_CHECK_INTERVAL'] = 0
+    swag = Swag(app)
+
+    @app.route('/users/')
+    @swag.mark.response(200, "Users", JSONFile(str(schema)))
+    def user_index():
+        pass
+
+    client = app.test_client()
+    client.get('/swagger/swagger.json')
+    schema.write('{"type": "object"}')
+    os.utime(str(schema), ns=(0, 0))
+    response = client.get('/swagger/swagger.json')
+    spec = json.loads(response.data.decode('utf-8'))
+    users = spec['paths']['/users/']['get']['responses']['200']
+    assert 'object' == users['schema']['type']
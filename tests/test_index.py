@@ -0,0 +1,55 @@
+"""
+tests.test_index
+================
+
+Tests for spec index.
+
+"""
+from flask_swag.index import PathTrie, SpecIndex
+
+
+def test_path_trie():
+    trie = PathTrie()
+    for path in ['/', '/users/', '/users/{user_id}', '/usersettings']:
+        trie.insert(path)
+
+    assert {'/users/', '/users/{user_id}'} == set(trie.find('/users'))
+    assert {'/users/', '/users/{user_id}'} == set(trie.find('/users/'))
+    assert ['/usersettings'] == trie.find('/usersettings')
+    assert [] == trie.find('/posts')
+    assert 4 == len(trie.find('/'))
+
+
+def test_spec_index():
+    paths = {
+        '/users/': {
+            'get': {'tags': ['user'], 'operationId': 'listUsers'},
+            'post': {'tags': ['user', 'admin'], 'operationId': 'createUser'},
+        },
+        '/users/{user_id}': {
+            'parameters': [{'name': 'user_id', 'in': 'path'}],
+            'delete': {'tags': ['admin'], 'operationId': 'deleteUser'},
+        },
+        '/posts/': {
+            'get': {'operationId': 'listPosts'},
+        },
+    }
+    index = SpecIndex(paths)
+
+    assert paths is index.query()
+    assert {
+        '/users/': paths['/users/'],
+        '/users/{user_id}': paths['/users/{user_id}'],
+    } == index.query(prefix='/users')
+    assert {
+        '/users/': {'post': paths['/users/']['post']},
+        '/users/{user_id}': paths['/users/{user_id}'],
+    } == index.query(tags=['admin'])
+    assert {
+        '/users/': {'post': paths['/users/']['post']},
+    } == index.query(prefix='/users/', tags=['user', 'admin'],
+                     operation_ids=['createUser', 'listPosts'])
+    assert {} == index.query(prefix='/posts', tags=['admin'])
+
+    # Results are memoized
+    assert index.query(tags=['admin']) is index.query(tags=['admin'])
@@ -5,8 +5,9 @@ tests.test_extractor
 Tests for mark.
 
 """
-from flask import Flask
+from flask import Blueprint, Flask
 
+from flask_swag import core
 from flask_swag.extractor import MarkExtractor
 from flask_swag.mark import Mark
 
@@ -127,3 +128,139 @@ def test_mark():
             }
         }
     } == extractor.extract_paths(app, endpoint='create')
+
+
+def test_lazy_mark():
+    """Lazy marks are built on first extraction."""
+    eager = Mark()
+    lazy = Mark(lazy=True)
+
+    def define(app, mark):
+        @app.route('/users/<int:user_id>', methods=['PUT'])
+        @mark.summary("Update a user.")
+        @mark.query('notify', bool, optional=True)
+        @mark.schema({
+            'type': 'object',
+            'properties': {
+                'name': {'type': 'string'},
+                'description': {'type': 'string'},
+            },
+        })
+        @mark.response(200, "Updated user.")
+        def update(user_id):
+            """Update a user."""
+            pass
+        return update
+
+    eager_app = Flask(__name__)
+    lazy_app = Flask(__name__)
+    define(eager_app, eager)
+    view = define(lazy_app, lazy)
+
+    # Only arguments are recorded
+    assert not hasattr(view, '_swag')
+    assert 4 == len(view._swag_deferred)
+
+    extractor = MarkExtractor()
+    expected = extractor.extract_paths(eager_app, endpoint='update')
+    assert expected == extractor.extract_paths(lazy_app, endpoint='update')
+    assert [] == view._swag_deferred
+    assert expected == extractor.extract_paths(lazy_app, endpoint='update')
+
+
+def test_defaults():
+    app = Flask(__name__)
+    mark = Mark()
+    blueprint = Blueprint('users', __name__)
+    mark.defaults(app, {
+        'produces': ['application/json'],
+        'responses': {500: {'description': "Server error."}},
+    })
+    mark.defaults(blueprint, {
+        'tags': ['users'],
+        'parameters': [core.Parameter(name='X-Token', in_='header',
+                                      type='string')],
+        'responses': {404: {'description': "Not found."}},
+    })
+
+    @blueprint.route('/users/<int:user_id>')
+    @mark.query('fields', str, optional=True)
+    @mark.response(200, "A user.")
+    def user_read(user_id):
+        pass
+
+    @blueprint.route('/users/')
+    @mark({'tags': ['admin']})
+    def user_index():
+        pass
+    app.register_blueprint(blueprint)
+
+    @app.route('/')
+    def main():
+        pass
+
+    extractor = MarkExtractor()
+    paths = extractor.extract_paths(app, exclude_endpoint='static')
+    read = paths['/users/{user_id}']['get']
+    assert ['users'] == read['tags']
+    assert ['application/json'] == read['produces']
+    assert {200, 404, 500} == set(read['responses'])
+    assert ['user_id', 'X-Token', 'fields'] == [
+        parameter['name'] for parameter in read['parameters']]
+    assert ['admin'] == paths['/users/']['get']['tags']
+    assert 'tags' not in paths['/']['get']
+    assert {500} == set(paths['/']['get']['responses'])
+    # Defaults are stored once, merged marks of a view are cached
+    assert 'tags' not in user_read._swag
+    merged = extractor._merged_marks[user_read][(id(app), 'users')]
+    paths = extractor.extract_paths(app, exclude_endpoint='static')
+    assert merged is extractor._merged_marks[user_read][(id(app), 'users')]
+    # Modifying extracted operations does not leak into cached marks
+    read['responses'][418] = {'description': "I'm a teapot."}
+    read['responses'][404]['description'] = "Gone."
+    read['parameters'].pop()
+    paths = extractor.extract_paths(app, exclude_endpoint='static')
+    responses = paths['/users/{user_id}']['get']['responses']
+    assert {200, 404, 500} == set(responses)
+    assert "Not found." == responses[404]['description']
+    assert 3 == len(paths['/users/{user_id}']['get']['parameters'])
+
+    # New defaults invalidate cached marks
+    mark.defaults(blueprint, {
+        'responses': {401: {'description': "Unauthorized."}},
+    })
+    paths = extractor.extract_paths(app, exclude_endpoint='static')
+    assert merged is not extractor._merged_marks[user_read][
+        (id(app), 'users')]
+    responses = paths['/users/{user_id}']['get']['responses']
+    assert {200, 401, 404, 500} == set(responses)
+
+
+def test_nested_defaults():
+    app = Flask(__name__)
+    mark = Mark()
+    parent = Blueprint('api', __name__, url_prefix='/api')
+    child = Blueprint('users', __name__, url_prefix='/users')
+    mark.defaults(parent, {
+        'produces': ['application/json'],
+        'responses': {500: {'description': "Server error."}},
+    })
+    mark.defaults(child, {'tags': ['users']})
+
+    @child.route('/')
+    def user_index():
+        pass
+    parent.register_blueprint(child)
+    app.register_blueprint(parent)
+
+    class LegacyExtractor(MarkExtractor):
+        def __init__(self):
+            # Does not call `super().__init__()`
+            pass
+
+    for extractor in (MarkExtractor(), LegacyExtractor()):
+        paths = extractor.extract_paths(app, exclude_endpoint='static')
+        operation = paths['/api/users/']['get']
+        assert ['users'] == operation['tags']
+        assert ['application/json'] == operation['produces']
+        assert {500} == set(operation['responses'])
@@ -0,0 +1,169 @@
+"""
+tests.test_validation
+=====================
+
+Tests for compiled validators.
+
+"""
+import json
+
+import pytest
+from flask import Flask, Response, g, jsonify
+
+from flask_swag import Swag
+from flask_swag.validation import ValidationError, compile_schema, \
+    compile_validator
+
+PARAMETERS = [
+    {'name': 'page', 'in': 'query', 'type': 'integer', 'minimum': 1,
+     'default': 1},
+    {'name': 'order', 'in': 'query', 'type': 'string',
+     'enum': ['asc', 'desc']},
+    {'name': 'ids', 'in': 'query', 'type': 'array',
+     'items': {'type': 'integer'}, 'maxItems': 3},
+    {'name': 'name', 'in': 'formData', 'type': 'string', 'required': True,
+     'maxLength': 8},
+    {'name': 'X-Flag', 'in': 'header', 'type': 'boolean'},
+]
+
+
+def test_compile_validator():
+    validate = compile_validator(PARAMETERS)
+    app = Flask(__name__)
+
+    with app.test_request_context('/?order=asc&ids=1,2', method='POST',
+                                  data={'name': 'foo'},
+                                  headers={'X-Flag': 'true'}):
+        from flask import request
+        assert {
+            'page': 1,
+            'order': 'asc',
+            'ids': [1, 2],
+            'name': 'foo',
+            'X-Flag': True,
+        } == validate(request)
+
+    with app.test_request_context('/?page=0&order=up&ids=1,2,3,a',
+                                  method='POST'):
+        from flask import request
+        with pytest.raises(ValidationError) as info:
+            validate(request)
+        assert {'page', 'order', 'ids', 'name'} == set(info.value.errors)
+
+
+def test_array_enum():
+    validate = compile_validator([
+        {'name': 'tags', 'in': 'query', 'type': 'array',
+         'items': {'type': 'string'}, 'enum': [['a', 'b'], ['c']]},
+        {'name': 'sizes', 'in': 'query', 'type': 'array',
+         'items': {'type': 'string'}, 'enum': ['s', 'm']},
+    ])
+    app = Flask(__name__)
+
+    with app.test_request_context('/?tags=a,b'):
+        from flask import request
+        assert {'tags': ['a', 'b']} == validate(request)
+
+    with app.test_request_context('/?tags=a&sizes=s,m'):
+        from flask import request
+        with pytest.raises(ValidationError) as info:
+            validate(request)
+        assert {'tags', 'sizes'} == set(info.value.errors)
+
+
+def test_compile_schema():
+    validate = compile_schema({
+        'type': 'object',
+        'required': ['name'],
+        'properties': {
+            'name': {'type': 'string', 'minLength': 1},
+            'tags': {'type': 'array', 'items': {'type': 'string'}},
+            'age': {'type': 'integer', 'minimum': 0},
+        },
+    })
+    value = {'name': 'foo', 'tags': ['a'], 'age': 3}
+    assert value is validate(value)
+
+    with pytest.raises(ValidationError) as info:
+        validate({'tags': ['a', 1], 'age': True})
+    assert {'/name', '/tags/1', '/age'} == set(info.value.errors)
+
+    with pytest.raises(ValidationError) as info:
+        validate([])
+    assert {''} == set(info.value.errors)
+
+
+def test_validate_requests():
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    app.config['SWAG_VALIDATE_REQUESTS'] = True
+    swag = Swag(app)
+
+    @app.route('/users/<int:user_id>/posts/', methods=['GET', 'POST'])
+    @swag.mark.query('page', int, optional=True, minimum=1)
+    @swag.mark.form('title', str, max_length=10)
+    def post_index(user_id):
+        return jsonify(g.swag_parameters)
+
+    client = app.test_client()
+    response = client.post('/users/1/posts/?page=2', data={'title': 'Hi'})
+    assert 200 == response.status_code
+    assert {'user_id': 1, 'page': 2, 'title': 'Hi'} == \
+        json.loads(response.data.decode('utf-8'))
+
+    response = client.get('/users/1/posts/?page=0')
+    assert 400 == response.status_code
+    assert {'page', 'title'} == \
+        set(json.loads(response.data.decode('utf-8'))['errors'])
+
+    # Spec itself is not validated
+    assert 200 == client.get('/swagger/swagger.json').status_code
+
+
+def test_validate_responses():
+    app = Flask(__name__)
+    app.config['SWAG_TITLE'] = "Test application."
+    app.config['SWAG_API_VERSION'] = '1.0.1'
+    app.config['SWAG_RESPONSE_VALIDATION_RATE'] = 1.0
+    swag = Swag(app)
+
+    user_schema = {
+        'type': 'object',
+        'required': ['name'],
+        'properties': {'name': {'type': 'string'}},
+    }
+
+    @app.route('/users/<name>')
+    @swag.mark.response(200, "User.", user_schema)
+    @swag.mark.response(404, "Not found.")
+    def user_read(name):
+        if name == 'missing':
+            return jsonify(error='not found'), 404
+        if name == 'broken':
+            return jsonify(name=1)
+        if name == 'malformed':
+            return Response('{"name": ', mimetype='application/json')
+        return jsonify(name=name)
+
+    mismatches = []
+
+    @swag.response_mismatch_handler
+    def report(endpoint, method, response, errors):
+        mismatches.append((endpoint, method, response.status_code, errors))
+
+    client = app.test_client()
+    assert 200 == client.get('/users/foo').status_code
+    assert 404 == client.get('/users/missing').status_code
+    assert [] == mismatches
+
+    assert 200 == client.get('/users/broken').status_code
+    assert [('user_read', 'GET', 200, {'/name': "Not string type"})] == \
+        mismatches
+
+    # Malformed body is reported, but served as is
+    del mismatches[:]
+    response = client.get('/users/malformed')
+    assert 200 == response.status_code
+    assert b'{"name": ' == response.data
+    assert [('user_read', 'GET', 200, {'': "Malformed JSON"})] == mismatches